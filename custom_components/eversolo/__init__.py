@@ -1,45 +1,122 @@
 """Eversolo integration."""
 from __future__ import annotations
 
+from functools import partial
+import shutil
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import device_registry as dr
 
 from .api import EversoloApiClient
-from .const import DOMAIN, LOGGER
-from .coordinator import EversoloDataUpdateCoordinator
+from .const import (
+    CONF_ABLE_REMOTE_BOOT,
+    CONF_CAPABILITIES,
+    CONF_FIRMWARE,
+    CONF_MODEL,
+    DATA_POLL_SCHEDULER,
+    DOMAIN,
+)
+from .coordinator import (
+    EversoloDataUpdateCoordinator,
+    image_cache_path,
+    snapshot_store,
+)
+from .scheduler import EversoloPollScheduler
+from .session import async_acquire_session, async_release_session
+
+# Entry data the client and the set of entities are built from. Changes to
+# other data, like the firmware version, are applied without a reload.
+RELOAD_KEYS = (CONF_HOST, CONF_PORT, CONF_ABLE_REMOTE_BOOT, CONF_CAPABILITIES)
 
 PLATFORMS: list[Platform] = [
     Platform.BUTTON,
     Platform.LIGHT,
     Platform.MEDIA_PLAYER,
     Platform.SELECT,
+    Platform.SENSOR,
 ]
 
 
+def _reload_data(entry: ConfigEntry) -> dict:
+    """Return the entry data that requires a reload when it changes."""
+    return {key: entry.data.get(key) for key in RELOAD_KEYS}
+
+
+def _async_update_device(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Update the model and firmware of the entry's device."""
+    device_registry = dr.async_get(hass)
+    if device := device_registry.async_get_device(
+        identifiers={(DOMAIN, entry.entry_id)}
+    ):
+        device_registry.async_update_device(
+            device.id,
+            model=entry.data.get(CONF_MODEL),
+            sw_version=entry.data.get(CONF_FIRMWARE),
+        )
+
+
+def _device_key(entry: ConfigEntry) -> str:
+    """Return the key identifying the device of an entry."""
+    return f"{entry.data[CONF_HOST]}:{entry.data[CONF_PORT]}"
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = coordinator = EversoloDataUpdateCoordinator(
+    scheduler: EversoloPollScheduler = hass.data.setdefault(
+        DATA_POLL_SCHEDULER, EversoloPollScheduler()
+    )
+    device = _device_key(entry)
+
+    # Entries created before duplicates were rejected have no unique id
+    if entry.unique_id is None and not any(
+        other.unique_id == device
+        for other in hass.config_entries.async_entries(DOMAIN)
+    ):
+        hass.config_entries.async_update_entry(entry, unique_id=device)
+
+    coordinator = EversoloDataUpdateCoordinator(
         hass=hass,
+        config_entry=entry,
         client=EversoloApiClient(
             host=entry.data[CONF_HOST],
             port=entry.data[CONF_PORT],
-            session=async_get_clientsession(hass),
+            session=async_acquire_session(
+                hass, entry.data[CONF_HOST], entry.data[CONF_PORT]),
+            shared_semaphore=scheduler.semaphore,
         ),
+        poll_offset=scheduler.acquire_offset(device),
     )
+    hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    # Accept offline device to expose WoL functionality
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except ConfigEntryNotReady:
-        LOGGER.info(
-            "Eversolo device is offline, integration set up will continue")
+    # Entities start from the snapshot if there is one and are unavailable
+    # otherwise, until the first refresh completes. Setup does not wait for
+    # it, so an offline device does not delay startup and can still be
+    # turned on via WoL.
+    if not await coordinator.async_restore_snapshot():
+        coordinator.last_update_success = False
+    entry.async_create_background_task(
+        hass, coordinator.async_first_refresh(), f"{DOMAIN} first refresh"
+    )
 
+    reload_data = _reload_data(entry)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    async def async_entry_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Reload the entry if data it was set up from changed."""
+        if _reload_data(entry) != reload_data:
+            hass.config_entries.async_schedule_reload(entry.entry_id)
+        else:
+            _async_update_device(hass, entry)
+
+    entry.async_on_unload(entry.add_update_listener(async_entry_updated))
+
+    # The first refresh may have stored capabilities while platforms were
+    # set up, before the listener was added
+    if _reload_data(entry) != reload_data:
+        hass.config_entries.async_schedule_reload(entry.entry_id)
 
     return True
 
@@ -47,11 +124,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Handle removal of an entry."""
     if unloaded := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        # The coordinator shuts down with the entry, it was created with it
         hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DATA_POLL_SCHEDULER].release_offset(_device_key(entry))
+        await async_release_session(
+            hass, entry.data[CONF_HOST], entry.data[CONF_PORT])
     return unloaded
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the data snapshot and the album art of a removed entry."""
+    await snapshot_store(hass, entry.entry_id).async_remove()
+    await hass.async_add_executor_job(
+        partial(
+            shutil.rmtree,
+            image_cache_path(hass, entry.entry_id),
+            ignore_errors=True,
+        )
+    )
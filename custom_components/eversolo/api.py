@@ -1,11 +1,42 @@
 """Eversolo API Client."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+import contextlib
+import copy
+from functools import partial
+import heapq
+import itertools
+import json
+import socket
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
 import aiohttp
 import async_timeout
-import socket
 
-from .const import LOGGER
+from .const import (
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEVICE_REQUEST_BURST,
+    DEVICE_REQUEST_RATE,
+    LOGGER,
+    MAX_IMAGE_BYTES,
+    MAX_RESPONSE_BYTES,
+    REQUIRED_ENDPOINTS,
+    RESPONSE_CACHE_TTL,
+)
+from .metrics import EversoloMetrics
+from .models import EversoloOptionIndex
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+# Fastest available JSON decoder, accepts bytes
+DEFAULT_JSON_LOADS = orjson.loads if orjson is not None else json.loads
 
 
 class EversoloApiClientError(Exception):
@@ -20,6 +51,239 @@ class EversoloApiClientAuthenticationError(EversoloApiClientError):
     """Exception to indicate an authentication error."""
 
 
+def _display_brightness_to_index(value: int) -> int:
+    """Convert a brightness in range 0..255 to the display's index 0..115."""
+    return round(value * (115 / 255))
+
+
+def _display_brightness_from_index(index: int) -> int:
+    """Convert the display's brightness index 0..115 to range 0..255."""
+    return round(index * (255 / 115))
+
+
+class SharedFetch:
+    """A fetch awaited by several callers, running until the last one leaves.
+
+    The fetch runs in a task of its own, so a caller that is cancelled
+    leaves it to the others instead of cancelling it for everyone. It is
+    only cancelled once every caller was.
+
+    on_release is called once the fetch finished, or right before it is
+    cancelled, so its owner stops handing it to new callers at once.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[Any]],
+        on_release: Callable[[SharedFetch], None] | None = None,
+    ) -> None:
+        """Start the fetch."""
+        self._on_release = on_release
+        self._task = asyncio.get_running_loop().create_task(self._async_run(fetch))
+        self._waiters = 0
+
+    async def async_wait(self) -> Any:
+        """Return the result of the fetch, or raise its exception."""
+        self._waiters += 1
+        try:
+            return await asyncio.shield(self._task)
+        finally:
+            self._waiters -= 1
+            if not self._waiters and not self._task.done():
+                self._release()
+                self._task.cancel()
+
+    async def _async_run(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run the fetch, releasing it once it finished."""
+        try:
+            return await fetch()
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        """Tell the owner once that the fetch is no longer shared."""
+        if (on_release := self._on_release) is not None:
+            self._on_release = None
+            on_release(self)
+
+
+class _LatestValueCommand:
+    """Send only the newest value of a command while one is in flight.
+
+    Values submitted while a request is in flight wait for it to finish;
+    all but the newest are then dropped instead of being sent.
+    """
+
+    def __init__(self, send) -> None:
+        """Initialize the command."""
+        self._send = send
+        self._lock = asyncio.Lock()
+        self._generation = 0
+
+    async def async_send(self, value) -> bool:
+        """Send the value unless a newer one arrives first, return if it was sent."""
+        self._generation += 1
+        generation = self._generation
+        async with self._lock:
+            if generation != self._generation:
+                return False
+            await self._send(value)
+            return True
+
+
+class _ReadCoalescer:
+    """Share identical reads in flight and reuse their results briefly.
+
+    Callers get shallow copies of shared results, as the fetchers add
+    derived keys to them. Invalidating drops cached results and detaches
+    reads in flight, so reads after a command see its effect.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        """Initialize the coalescer, a ttl of 0 disables the cache."""
+        self._ttl = ttl
+        self._generation = 0
+        self._pending: dict[str, SharedFetch] = {}
+        self._cache: dict[str, tuple[float, any]] = {}
+
+    async def async_get(self, key: str, fetch):
+        """Return the result for key, joining or starting a fetch if needed.
+
+        A shared read goes on while any caller still waits for it, so a
+        cancelled caller does not fail the others.
+        """
+        if (cached := self._cache.get(key)) is not None and cached[0] > time.monotonic():
+            return copy.copy(cached[1])
+
+        if (shared := self._pending.get(key)) is None:
+            shared = self._pending[key] = SharedFetch(
+                partial(self._async_fetch, key, fetch, self._generation),
+                partial(self._release, key),
+            )
+        return copy.copy(await shared.async_wait())
+
+    async def _async_fetch(self, key: str, fetch, generation: int):
+        """Run a shared read, caching its result unless invalidated meanwhile."""
+        result = await fetch()
+        if self._ttl and generation == self._generation:
+            self._cache[key] = (time.monotonic() + self._ttl, result)
+        return result
+
+    def _release(self, key: str, shared: SharedFetch) -> None:
+        """Stop sharing a read that finished or is cancelled."""
+        if self._pending.get(key) is shared:
+            del self._pending[key]
+
+    def invalidate(self) -> None:
+        """Forget cached results and reads in flight."""
+        self._generation += 1
+        self._pending.clear()
+        self._cache.clear()
+
+
+# Request priorities, lower runs first
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+
+
+class _RequestLimiter:
+    """Limit the request rate and the requests in flight to a device.
+
+    A token bucket refills at rate tokens per second up to burst, and each
+    request takes a token and an in-flight slot. Waiting requests start in
+    order of priority, then arrival, so commands overtake queued polls.
+    """
+
+    def __init__(self, rate: float, burst: int, max_in_flight: int, metrics) -> None:
+        """Initialize the limiter with a full bucket."""
+        self._rate = rate
+        self._burst = burst
+        self._max_in_flight = max_in_flight
+        self._metrics = metrics
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting to start."""
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: int):
+        """Wait for a token and an in-flight slot, hold the slot while in use."""
+        start = time.monotonic()
+        if self._waiters or not self._try_start():
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            self._metrics.record_queued(self.queue_depth)
+            self._wake()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Started and cancelled at once, hand the slot on
+                    self._release()
+                else:
+                    self._wake()
+                raise
+        self._metrics.record_queue_wait(priority, time.monotonic() - start)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _try_start(self) -> bool:
+        """Take a token and a slot if both are available."""
+        if self._in_flight >= self._max_in_flight:
+            return False
+        now = time.monotonic()
+        self._tokens = min(
+            self._tokens + (now - self._refilled_at) * self._rate, self._burst)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self._in_flight += 1
+        return True
+
+    def _release(self) -> None:
+        """Free a slot and start waiting requests."""
+        self._in_flight -= 1
+        self._wake()
+
+    def _on_token(self) -> None:
+        """Start waiting requests once the next token is available."""
+        self._timer = None
+        self._wake()
+
+    def _wake(self) -> None:
+        """Start waiting requests while tokens and slots allow it."""
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._try_start():
+                break
+            heapq.heappop(self._waiters)[2].set_result(None)
+
+        if not self._waiters and self._timer is not None:
+            # Every waiter started or was cancelled
+            self._timer.cancel()
+            self._timer = None
+        elif (
+            self._waiters
+            and self._timer is None
+            and self._in_flight < self._max_in_flight
+        ):
+            # Out of tokens, wake up when the next one is available
+            self._timer = asyncio.get_running_loop().call_later(
+                (1 - self._tokens) / self._rate, self._on_token)
+
+
 class EversoloApiClient:
     """Eversolo API Client."""
 
@@ -28,26 +292,169 @@ class EversoloApiClient:
         host: str,
         port: int,
         session: aiohttp.ClientSession,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        shared_semaphore: asyncio.Semaphore | None = None,
+        json_loads=DEFAULT_JSON_LOADS,
+        response_cache_ttl: float = RESPONSE_CACHE_TTL,
+        request_rate: float = DEVICE_REQUEST_RATE,
+        request_burst: int = DEVICE_REQUEST_BURST,
     ) -> None:
         """Eversolo API Client."""
         self._host = host
         self._port = port
         self._session = session
+        self._json_loads = json_loads
+        self.metrics = EversoloMetrics()
+        self._reads = _ReadCoalescer(response_cache_ttl)
+        self._limiter = _RequestLimiter(
+            request_rate, request_burst, max_concurrent_requests, self.metrics)
+        # Limits requests across all devices, if set
+        self._shared_semaphore = shared_semaphore
+        # Last raw option list and its index, per kind of option
+        self._option_indexes: dict[str, tuple[list, EversoloOptionIndex]] = {}
+        self._fetchers = {
+            "display_brightness": self.async_get_display_brightness,
+            "input_output_state": self.async_get_input_output_state,
+            "knob_brightness": self.async_get_knob_brightness,
+            "music_control_state": self.async_get_music_control_state,
+            "vu_mode_state": self.async_get_vu_mode_state,
+            "spectrum_mode_state": self.async_get_spectrum_state,
+            "is_display_on": self.async_get_display_state,
+        }
+        self._display_brightness_command = _LatestValueCommand(
+            self._async_send_display_brightness)
+        self._knob_brightness_command = _LatestValueCommand(
+            self._async_send_knob_brightness)
+        self._seek_command = _LatestValueCommand(self._async_send_seek_time)
+        self._volume_command = _LatestValueCommand(self._async_send_volume)
+
+    @property
+    def endpoints(self) -> tuple[str, ...]:
+        """Return the keys of all pollable endpoints."""
+        return tuple(self._fetchers)
+
+    async def async_check_connection(self, timeout: float) -> bool:
+        """Return whether a TCP connection to the device opens within timeout."""
+        try:
+            async with async_timeout.timeout(timeout):
+                _, writer = await asyncio.open_connection(self._host, self._port)
+        except (TimeoutError, OSError):
+            return False
 
-    async def async_get_data(self):
-        """Get data from the API."""
-        result = {
-            "display_brightness": await self.async_get_display_brightness(),
-            "input_output_state": await self.async_get_input_output_state(),
-            "knob_brightness": await self.async_get_knob_brightness(),
-            "music_control_state": await self.async_get_music_control_state(),
-            "vu_mode_state": await self.async_get_vu_mode_state(),
-            "spectrum_mode_state": await self.async_get_spectrum_state(),
-            "is_display_on": await self.async_get_display_state(),
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+        return True
+
+    async def async_get_data(
+        self,
+        endpoints=None,
+        concurrent: bool = True,
+        deadline: float | None = None,
+        always_wait: Iterable[str] = (),
+    ):
+        """Get data from the API.
+
+        Only the given endpoint keys are fetched, or all of them if omitted.
+        In concurrent mode the requests run in parallel, limited by the
+        device's rate limiter. Endpoints still pending after deadline seconds
+        are cancelled, except those in always_wait, which run until their
+        own timeout. Endpoints that fail or are cancelled are left out of
+        the result; an exception is only raised if none succeeded.
+        """
+        keys = list(self._fetchers if endpoints is None else endpoints)
+
+        if not keys:
+            return {}
+
+        if not concurrent:
+            result = {key: await self._fetchers[key]() for key in keys}
+            LOGGER.debug("Fetched data from API: %s", result)
+            return result
+
+        tasks = {
+            key: asyncio.create_task(self._fetchers[key]())
+            for key in keys
         }
+        try:
+            _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+            if awaited := [
+                task for key, task in tasks.items()
+                if key in always_wait and task in pending
+            ]:
+                await asyncio.wait(awaited)
+                pending = {task for task in pending if not task.done()}
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        result = {}
+        errors = []
+        for key, task in tasks.items():
+            if task in pending:
+                LOGGER.debug("Stopped waiting for %s after %.2f s", key, deadline)
+                self.metrics.record_abandoned(key)
+                continue
+            if task.cancelled():
+                errors.append(EversoloApiClientCommunicationError(
+                    f"Fetching {key} was cancelled"))
+                continue
+            if isinstance(exception := task.exception(), EversoloApiClientAuthenticationError):
+                raise exception
+            if exception is not None:
+                LOGGER.debug("Fetching %s failed: %s", key, exception)
+                errors.append(exception)
+                continue
+            result[key] = task.result()
+
+        if not result and errors:
+            raise errors[0]
+        if not result and pending:
+            raise EversoloApiClientCommunicationError(
+                f"No endpoint answered within {deadline:.2f} s")
+
         LOGGER.debug("Fetched data from API: %s", result)
         return result
 
+    async def async_probe_capabilities(self) -> tuple[set[str], dict]:
+        """Fetch every endpoint once and return the supported ones and their data.
+
+        An endpoint is unsupported if the device answers it with 404 or
+        returns no usable data. Any other failure raises, so the probe is
+        retried, as it says more about the device than about the model.
+        Required endpoints raise if they are unsupported.
+        """
+        keys = list(self._fetchers)
+        responses = await asyncio.gather(
+            *(self._fetchers[key]() for key in keys),
+            return_exceptions=True,
+        )
+
+        supported = set()
+        data = {}
+        for key, response in zip(keys, responses):
+            if isinstance(response, BaseException) and not _is_not_found(response):
+                if isinstance(response, EversoloApiClientError):
+                    raise response
+                raise EversoloApiClientCommunicationError(
+                    f"Probing {key} failed") from response
+            if isinstance(response, BaseException) or not _has_data(response):
+                if key in REQUIRED_ENDPOINTS:
+                    raise EversoloApiClientError(
+                        f"Required endpoint {key} is not available")
+                LOGGER.debug("Endpoint %s is not supported: %s", key, response)
+                continue
+            supported.add(key)
+            data[key] = response
+
+        LOGGER.debug("Supported endpoints: %s", sorted(supported))
+        return supported, data
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for the rate limiter."""
+        return self._limiter.queue_depth
+
     async def async_get_music_control_state(self):
         """Return music control state."""
         result = await self._api_wrapper(
@@ -56,42 +463,39 @@ class EversoloApiClient:
         )
         return result
 
-    def transform_sources(self, input_output_state: dict) -> dict:
+    def transform_sources(self, input_output_state: dict) -> EversoloOptionIndex:
         """Return available input sources."""
-        sources = input_output_state.get("inputData", None)
+        return self._option_index(
+            "sources", input_output_state.get("inputData", None), "name")
 
-        if sources is None:
-            return None
-
-        transformed_sources = {}
-
-        for source in list(sources):
-            transformed_sources[source["tag"].replace(
-                "/", "")] = source["name"]
-
-        return transformed_sources
-
-    def transform_outputs(self, input_output_state: dict) -> list:
-        """Return available input sources."""
+    def transform_outputs(self, input_output_state: dict) -> EversoloOptionIndex:
+        """Return available outputs."""
         outputs = input_output_state.get("outputData", None)
 
         if outputs is None:
             return None
 
-        # Write data property to transformed_sources with an entry with index and title each
-        transformed_sources = []
+        return self._option_index(
+            "outputs",
+            [output for output in outputs if output["enable"] == 1],
+            "name",
+        )
 
-        enabled_outputs = list(
-            filter(lambda output: output["enable"] == 1, outputs))
+    def _option_index(self, kind: str, entries: list | None, name_key: str):
+        """Return the index of an option list, rebuilt only if it changed."""
+        if entries is None:
+            return None
 
-        for source, index in zip(enabled_outputs, range(len(enabled_outputs))):
-            transformed_sources.append({
-                "index": index,
-                "title": source["name"],
-                "tag": source["tag"].replace("/", "")
-            })
+        cached = self._option_indexes.get(kind)
+        if cached is not None and cached[0] == entries:
+            return cached[1]
 
-        return transformed_sources
+        index = EversoloOptionIndex(
+            (entry.get(name_key, ""), str(entry.get("tag", "")).replace("/", ""))
+            for entry in entries
+        )
+        self._option_indexes[kind] = (entries, index)
+        return index
 
     async def async_get_input_output_state(self):
         """Return input/output state."""
@@ -100,9 +504,12 @@ class EversoloApiClient:
             url=f"http://{self._host}:{self._port}/ZidooMusicControl/v2/getInputAndOutputList",
         )
 
+        return self._add_input_output_transforms(result)
+
+    def _add_input_output_transforms(self, result: dict) -> dict:
+        """Add the source and output indexes to an input/output state."""
         result["transformed_sources"] = self.transform_sources(result)
         result["transformed_outputs"] = self.transform_outputs(result)
-
         return result
 
     async def async_get_vu_mode_state(self):
@@ -111,7 +518,7 @@ class EversoloApiClient:
             method="get",
             url=f"http://{self._host}:{self._port}/SystemSettings/displaySettings/getVUModeList",
         )
-        return result
+        return self._add_options_transform("vu_modes", result)
 
     async def async_get_spectrum_state(self):
         """Return spectrum state."""
@@ -120,6 +527,26 @@ class EversoloApiClient:
             url=f"http://{self._host}:{
                 self._port}/SystemSettings/displaySettings/getSpPlayModeList",
         )
+        return self._add_options_transform("spectrum_modes", result)
+
+    def _add_options_transform(self, kind: str, result: dict) -> dict:
+        """Add the option index to a VU or spectrum mode list."""
+        result["transformed_options"] = self._option_index(
+            kind, result.get("data", None), "title")
+        return result
+
+    def restore_data(self, data: dict) -> dict:
+        """Add the derived values to raw endpoint data, e.g. from a snapshot."""
+        result = dict(data)
+        if isinstance(state := result.get("input_output_state"), dict):
+            result["input_output_state"] = self._add_input_output_transforms(
+                dict(state))
+        for key, kind in (
+            ("vu_mode_state", "vu_modes"),
+            ("spectrum_mode_state", "spectrum_modes"),
+        ):
+            if isinstance(state := result.get(key), dict):
+                result[key] = self._add_options_transform(kind, dict(state))
         return result
 
     async def async_get_display_state(self):
@@ -168,13 +595,18 @@ class EversoloApiClient:
             LOGGER.debug('Key "currentValue" not found in response')
             return None
 
-        # Max value for brightness is 115
-        return round(current_value * (255 / 115))
+        return _display_brightness_from_index(current_value)
+
+    async def async_set_display_brightness(self, value) -> bool:
+        """Set the display brightness to a value in range 0..255.
+
+        Returns False if the value was superseded by a newer one.
+        """
+        return await self._display_brightness_command.async_send(value)
 
-    async def async_set_display_brightness(self, value) -> any:
-        """Set the display brightness to a value in range 0..255."""
-        # Max value for brightness is 115
-        brightness = round(value * (115 / 255))
+    async def _async_send_display_brightness(self, value) -> any:
+        """Send the display brightness to the device."""
+        brightness = _display_brightness_to_index(value)
         return await self._api_wrapper(
             method="get",
             url=f"http://{self._host}:{
@@ -182,6 +614,11 @@ class EversoloApiClient:
             parseJson=False,
         )
 
+    @staticmethod
+    def quantize_display_brightness(value: int) -> int:
+        """Return the display brightness the device reports after setting value."""
+        return _display_brightness_from_index(_display_brightness_to_index(value))
+
     async def async_get_knob_brightness(self) -> any:
         """Return the knob brightness in range 0..255."""
         result = await self._api_wrapper(
@@ -197,8 +634,15 @@ class EversoloApiClient:
         # Max value for brightness is 255
         return round(current_value)
 
-    async def async_set_knob_brightness(self, value) -> any:
-        """Set the knob brightness to a value in range 0..255."""
+    async def async_set_knob_brightness(self, value) -> bool:
+        """Set the knob brightness to a value in range 0..255.
+
+        Returns False if the value was superseded by a newer one.
+        """
+        return await self._knob_brightness_command.async_send(value)
+
+    async def _async_send_knob_brightness(self, value) -> any:
+        """Send the knob brightness to the device."""
         # Max value for brightness is 255
         return await self._api_wrapper(
             method="get",
@@ -333,16 +777,30 @@ class EversoloApiClient:
             parseJson=False,
         )
 
-    async def async_seek_time(self, time) -> any:
-        """Seeks to a time given in milliseconds."""
+    async def async_seek_time(self, time) -> bool:
+        """Seeks to a time given in milliseconds.
+
+        Returns False if the time was superseded by a newer one.
+        """
+        return await self._seek_command.async_send(time)
+
+    async def _async_send_seek_time(self, time) -> any:
+        """Send the seek time to the device."""
         await self._api_wrapper(
             method="get",
             url=f"http://{self._host}:{self._port}/ZidooMusicControl/v2/seekTo?time={time}",
             parseJson=False,
         )
 
-    async def async_set_volume(self, volume) -> any:
-        """Set the volume."""
+    async def async_set_volume(self, volume) -> bool:
+        """Set the volume.
+
+        Returns False if the volume was superseded by a newer one.
+        """
+        return await self._volume_command.async_send(volume)
+
+    async def _async_send_volume(self, volume) -> any:
+        """Send the volume to the device."""
         await self._api_wrapper(
             method="get",
             url=f"http://{self._host}:{
@@ -376,6 +834,17 @@ class EversoloApiClient:
         )
         return result
 
+    async def async_get_image(self, url) -> tuple[bytes, str | None]:
+        """Fetch an image and return its content and content type."""
+        return await self._api_wrapper(
+            method="get",
+            url=url,
+            parseJson=False,
+            withContentType=True,
+            maxBytes=MAX_IMAGE_BYTES,
+            endpoint="image",
+        )
+
     def create_image_url_by_song_id(self, song_id) -> any:
         """Create url to fetch album covers when using the internal player."""
         return f"http://{self._host}:{self._port}/ZidooMusicControl/v2/getImage?id={song_id}&target=16"
@@ -391,26 +860,151 @@ class EversoloApiClient:
         data: dict | None = None,
         headers: dict | None = None,
         parseJson: bool = True,
+        withContentType: bool = False,
+        maxBytes: int = MAX_RESPONSE_BYTES,
+        endpoint: str | None = None,
     ) -> any:
-        """Get information from the API."""
+        """Get information from the API.
+
+        With parseJson the body is decoded as JSON, with withContentType the
+        raw body and its content type are returned. Otherwise the body is
+        drained without being kept, so the connection can be reused, and
+        None is returned. Bodies larger than maxBytes are rejected.
+
+        Latency and failures are recorded in metrics under the endpoint
+        name, which defaults to the last segment of the URL path. The
+        timeout adapts to the endpoint's observed round-trip times.
+
+        Identical JSON reads share one request and its result for
+        response_cache_ttl seconds. Commands invalidate shared results
+        before and after they are sent.
+
+        Requests pass the device's rate limiter, which caps the request rate
+        and the requests in flight. Commands, requests without a returned
+        body, are sent before waiting reads and images.
+        """
+        if endpoint is None:
+            endpoint = urlsplit(url).path.rpartition("/")[2]
+        is_command = not parseJson and not withContentType
+        request = partial(
+            self._async_measured_request,
+            endpoint, method, url, data, headers, parseJson, withContentType, maxBytes,
+            PRIORITY_COMMAND if is_command else PRIORITY_POLL,
+        )
+
+        if parseJson and method == "get" and data is None:
+            return await self._reads.async_get(url, request)
+        if not is_command:
+            return await request()
+
+        self._reads.invalidate()
         try:
-            async with async_timeout.timeout(10):
-                response = await self._session.request(
+            return await request()
+        finally:
+            self._reads.invalidate()
+
+    async def _async_measured_request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        data: dict | None,
+        headers: dict | None,
+        parseJson: bool,
+        withContentType: bool,
+        maxBytes: int,
+        priority: int,
+    ) -> any:
+        """Send a request once the rate limiter lets it, recording metrics.
+
+        The shared semaphore, if any, is only held while the request is
+        sent, not while it waits for the limiter, so a device with queued
+        requests does not hold up the others. The request uses the
+        endpoint's adaptive timeout, which does not include either wait.
+        """
+        async with (
+            self._limiter.slot(priority),
+            self._shared_semaphore or contextlib.nullcontext(),
+        ):
+            return await self._async_timed_request(
+                endpoint, method, url, data, headers, parseJson, withContentType,
+                maxBytes)
+
+    async def _async_timed_request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        data: dict | None,
+        headers: dict | None,
+        parseJson: bool,
+        withContentType: bool,
+        maxBytes: int,
+    ) -> any:
+        """Send a request with the endpoint's adaptive timeout, recording metrics."""
+        timeout = self.metrics.endpoint(endpoint).rtt.timeout()
+        start = time.perf_counter()
+        try:
+            result = await self._request(
+                method, url, data, headers, parseJson, withContentType, maxBytes,
+                timeout)
+        except EversoloApiClientCommunicationError as exception:
+            if isinstance(exception.__cause__, TimeoutError):
+                self.metrics.record_timeout(endpoint)
+            else:
+                self.metrics.record_error(endpoint)
+            raise
+        except EversoloApiClientError:
+            self.metrics.record_error(endpoint)
+            raise
+        except asyncio.CancelledError:
+            self.metrics.record_cancelled(endpoint, time.perf_counter() - start)
+            raise
+        self.metrics.record_success(endpoint, time.perf_counter() - start)
+        return result
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        data: dict | None,
+        headers: dict | None,
+        parseJson: bool,
+        withContentType: bool,
+        maxBytes: int,
+        timeout: float,
+    ) -> any:
+        """Send a request and read its response as _api_wrapper describes."""
+        try:
+            async with (
+                async_timeout.timeout(timeout),
+                self._session.request(
                     method=method,
                     url=url,
                     headers=headers,
                     json=data,
-                )
+                ) as response,
+            ):
                 if response.status in (401, 403):
                     raise EversoloApiClientAuthenticationError(
                         "Invalid credentials",
                     )
                 response.raise_for_status()
                 if parseJson:
-                    return await response.json(content_type=None)
+                    return self._decode_json(
+                        await self._read_body(response, maxBytes))
+                elif withContentType:
+                    return (
+                        await self._read_body(response, maxBytes),
+                        response.content_type,
+                    )
                 else:
-                    return await response.read()
+                    async for _ in response.content.iter_any():
+                        pass
+                    return None
 
+        except EversoloApiClientError:
+            raise
         except TimeoutError as exception:
             raise EversoloApiClientCommunicationError(
                 "Timeout error fetching information",
@@ -423,3 +1017,46 @@ class EversoloApiClient:
             raise EversoloApiClientError(
                 "Something really wrong happened!"
             ) from exception
+
+    @staticmethod
+    async def _read_body(response: aiohttp.ClientResponse, max_bytes: int) -> bytes:
+        """Read the response body, raise if it is larger than max_bytes."""
+        if response.content_length is not None and response.content_length > max_bytes:
+            raise EversoloApiClientError(
+                f"Response of {response.content_length} bytes exceeds {max_bytes} bytes"
+            )
+
+        body = bytearray()
+        async for chunk in response.content.iter_any():
+            body += chunk
+            if len(body) > max_bytes:
+                raise EversoloApiClientError(
+                    f"Response exceeds {max_bytes} bytes")
+        return bytes(body)
+
+    def _decode_json(self, body: bytes) -> any:
+        """Decode a JSON body, an empty body decodes to None."""
+        if not body.strip():
+            return None
+        try:
+            return self._json_loads(body)
+        except ValueError:
+            if self._json_loads is json.loads:
+                raise
+            # Fall back to the standard library for input the fast decoder rejects
+            return json.loads(body)
+
+
+def _is_not_found(exception: BaseException) -> bool:
+    """Return whether a request failed because the device lacks the endpoint."""
+    cause = exception.__cause__
+    return isinstance(cause, aiohttp.ClientResponseError) and cause.status == 404
+
+
+def _has_data(response) -> bool:
+    """Return whether an endpoint response holds usable data."""
+    if response is None:
+        return False
+    if isinstance(response, dict) and "transformed_options" in response:
+        return bool(response["transformed_options"])
+    return True
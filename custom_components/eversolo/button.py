@@ -10,6 +10,7 @@ from homeassistant.components.button import (
     ButtonEntity,
     ButtonEntityDescription,
 )
+from homeassistant.config_entries import ConfigEntry
 from .const import CONF_ABLE_REMOTE_BOOT, DOMAIN
 from .coordinator import EversoloDataUpdateCoordinator
 from .entity import EversoloEntity
@@ -103,6 +104,7 @@ async def async_setup_entry(hass, entry, async_add_devices):
         EversoloButton(
             coordinator=coordinator,
             entity_description=entity_description,
+            config_entry=entry,
         )
         for entity_description in ENTITY_DESCRIPTIONS
         if entity_description.key != "power_on" or able_remote_boot
@@ -112,16 +114,19 @@ async def async_setup_entry(hass, entry, async_add_devices):
 class EversoloButton(EversoloEntity, ButtonEntity):
     """Button to control Eversolo actions."""
 
+    _data_keys = ()
+
     def __init__(
         self,
         coordinator: EversoloDataUpdateCoordinator,
         entity_description: EversoloButtonDescription[EversoloDataUpdateCoordinator],
+        config_entry: ConfigEntry | None = None,
     ) -> None:
         """Initialize Eversolo button."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, config_entry)
         self.entity_description = entity_description
         self._attr_unique_id = (
-            f"{coordinator.config_entry.entry_id}_{entity_description.key}"
+            f"{self._config_entry.entry_id}_{entity_description.key}"
         )
 
     @property
@@ -6,7 +6,6 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.helpers import config_validation as cv, selector
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from .api import (
     EversoloApiClient,
@@ -15,6 +14,7 @@ from .api import (
     EversoloApiClientError,
 )
 from .const import DEFAULT_PORT, DOMAIN, LOGGER
+from .session import async_acquire_session, async_release_session
 
 
 class EversoloFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -29,6 +29,9 @@ class EversoloFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Handle a flow initialized by the user."""
         _errors = {}
         if user_input is not None:
+            await self.async_set_unique_id(
+                f"{user_input[CONF_HOST]}:{user_input[CONF_PORT]}")
+            self._abort_if_unique_id_configured()
             try:
                 await self._test_credentials(
                     host=user_input[CONF_HOST], port=user_input[CONF_PORT]
@@ -77,6 +80,9 @@ class EversoloFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         client = EversoloApiClient(
             host=host,
             port=port,
-            session=async_create_clientsession(self.hass),
+            session=async_acquire_session(self.hass, host, port),
         )
-        await client.async_get_data()
+        try:
+            await client.async_get_data()
+        finally:
+            await async_release_session(self.hass, host, port)
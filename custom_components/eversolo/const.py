@@ -10,8 +10,125 @@ ATTRIBUTION = ""
 
 DEFAULT_PORT = 9529
 DEFAULT_UPDATE_INTERVAL = 1
+DEFAULT_MAX_CONCURRENT_REQUESTS = 7
+
+# Requests in flight at once across all Eversolo devices
+GLOBAL_MAX_IN_FLIGHT_REQUESTS = 32
+
+DATA_POLL_SCHEDULER = f"{DOMAIN}_poll_scheduler"
+DATA_SESSIONS = f"{DOMAIN}_sessions"
+
+# Connection pool of the per-device HTTP session
+DEVICE_CONNECTION_LIMIT = DEFAULT_MAX_CONCURRENT_REQUESTS + 1
+DEVICE_KEEPALIVE_TIMEOUT = 75
+DEVICE_DNS_CACHE_TTL = 300
+
+# Adaptive poll interval in seconds, depending on the playback state
+POLL_INTERVAL_PLAYING = DEFAULT_UPDATE_INTERVAL
+POLL_INTERVAL_PAUSED = 3
+POLL_INTERVAL_IDLE = 5
+
+# Backoff in seconds while the device is unreachable
+OFFLINE_BACKOFF_MIN = 2
+OFFLINE_BACKOFF_MAX = 60
+OFFLINE_BACKOFF_FACTOR = 2
+OFFLINE_BACKOFF_JITTER = 0.1
+
+# Seconds an optimistic value is kept while the device has not confirmed it
+OPTIMISTIC_UPDATE_TIMEOUT = 5
+
+# Deviation in seconds between the reported and the extrapolated media
+# position before the position is re-anchored
+MEDIA_POSITION_TOLERANCE = 1.5
+
+# Album art cache sizes in bytes, a disk size of 0 disables the disk cache
+IMAGE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+IMAGE_CACHE_DISK_MAX_BYTES = 64 * 1024 * 1024
+
+# Request timeouts in seconds, derived per endpoint from the smoothed
+# round-trip time as srtt + K * rttvar (RFC 6298) within these bounds
+REQUEST_TIMEOUT_MIN = 1
+REQUEST_TIMEOUT_MAX = 10
+RTT_ALPHA = 1 / 8
+RTT_BETA = 1 / 4
+RTT_K = 4
+
+# Fraction of the poll interval a poll waits for slow endpoints before it
+# keeps their last value; the playback state is awaited until its timeout
+POLL_CYCLE_DEADLINE_FRACTION = 0.8
+
+# Consecutive failures that open the circuit of an endpoint, and seconds
+# until it is retried, doubling while the retries keep failing
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_MIN = 5
+BREAKER_RESET_MAX = 300
+
+# Seconds the last good value of an endpoint is served past its poll
+# interval while fetching it fails, and while the device does not answer
+# before polls fail
+STALE_DATA_TTL = 30
+
+# Seconds identical reads share a response, 0 disables the cache
+RESPONSE_CACHE_TTL = 0.2
+
+# Requests per second sent to a device and the burst allowed above that
+# rate; at most DEFAULT_MAX_CONCURRENT_REQUESTS are in flight at once
+DEVICE_REQUEST_RATE = 10
+DEVICE_REQUEST_BURST = 10
+
+# Largest accepted response body in bytes, for JSON and for album art
+MAX_RESPONSE_BYTES = 1024 * 1024
+MAX_IMAGE_BYTES = 4 * 1024 * 1024
+
+# Upper bounds in seconds of the request and poll cycle latency buckets
+METRICS_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Poll tiers in seconds, applied per endpoint by the coordinator
+POLL_INTERVAL_FAST = DEFAULT_UPDATE_INTERVAL
+POLL_INTERVAL_MEDIUM = 10
+POLL_INTERVAL_SLOW = 60
+
+POLL_TIERS = {
+    "music_control_state": POLL_INTERVAL_FAST,
+    "input_output_state": POLL_INTERVAL_MEDIUM,
+    "is_display_on": POLL_INTERVAL_MEDIUM,
+    "display_brightness": POLL_INTERVAL_SLOW,
+    "knob_brightness": POLL_INTERVAL_SLOW,
+    "vu_mode_state": POLL_INTERVAL_SLOW,
+    "spectrum_mode_state": POLL_INTERVAL_SLOW,
+}
+
+# Seconds until device info is fetched again after success, to notice
+# firmware updates, and after a failure
+DEVICE_INFO_TTL = 6 * 60 * 60
+DEVICE_INFO_RETRY_INTERVAL = 5 * 60
+
+# Seconds to wait for a TCP connection before the first refresh
+CONNECT_CHECK_TIMEOUT = 2
+
+# Slow-changing endpoints persisted across restarts, and the storage
+# version and write delay in seconds of that snapshot
+SNAPSHOT_KEYS = (
+    "input_output_state",
+    "vu_mode_state",
+    "spectrum_mode_state",
+    "display_brightness",
+    "knob_brightness",
+)
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30
+
+# Endpoints every model supports; a probe that cannot reach them is retried
+REQUIRED_ENDPOINTS = ("music_control_state", "input_output_state")
+
+# Seconds until a failed probe is retried, doubling while it keeps failing;
+# polls in between use the capabilities known so far
+PROBE_RETRY_MIN = 30
+PROBE_RETRY_MAX = 30 * 60
 
 CONF_NET_MAC = "net_mac"
 CONF_MODEL = "model"
 CONF_FIRMWARE = "firmware"
 CONF_ABLE_REMOTE_BOOT = "able_remote_boot"
+CONF_CAPABILITIES = "capabilities"
+CONF_CAPABILITIES_FIRMWARE = "capabilities_firmware"
@@ -1,15 +1,20 @@
 """DataUpdateCoordinator for eversolo."""
 from __future__ import annotations
 
-from datetime import timedelta
+from collections.abc import Awaitable, Iterable
+from datetime import datetime, timedelta
+import time
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
 from wakeonlan import send_magic_packet
 
 from .api import (
@@ -19,13 +24,48 @@ from .api import (
 )
 from .const import (
     CONF_ABLE_REMOTE_BOOT,
+    CONF_CAPABILITIES,
+    CONF_CAPABILITIES_FIRMWARE,
     CONF_FIRMWARE,
     CONF_MODEL,
     CONF_NET_MAC,
+    CONNECT_CHECK_TIMEOUT,
     DEFAULT_UPDATE_INTERVAL,
+    DEVICE_INFO_RETRY_INTERVAL,
+    DEVICE_INFO_TTL,
     DOMAIN,
+    IMAGE_CACHE_DISK_MAX_BYTES,
+    IMAGE_CACHE_MAX_BYTES,
     LOGGER,
+    OPTIMISTIC_UPDATE_TIMEOUT,
+    POLL_CYCLE_DEADLINE_FRACTION,
+    POLL_TIERS,
+    PROBE_RETRY_MAX,
+    PROBE_RETRY_MIN,
+    SNAPSHOT_KEYS,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_VERSION,
+    STALE_DATA_TTL,
 )
+from .image_cache import EversoloImageCache
+from .models import EversoloPlaybackState
+from .scheduler import AdaptivePollInterval, CircuitBreaker, EndpointScheduler
+
+# Keys of data the playback state is parsed from
+PLAYBACK_KEYS = frozenset({"music_control_state", "input_output_state"})
+
+
+def snapshot_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store of the data snapshot of a config entry."""
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+
+
+def image_cache_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the album art disk cache of a config entry.
+
+    Art is keyed by song id or path, which are only unique per device.
+    """
+    return hass.config.path(".cache", DOMAIN, "images", entry_id)
 
 
 class EversoloDataUpdateCoordinator(DataUpdateCoordinator):
@@ -36,44 +76,427 @@ class EversoloDataUpdateCoordinator(DataUpdateCoordinator):
     def __init__(
         self,
         hass: HomeAssistant,
+        config_entry: ConfigEntry,
         client: EversoloApiClient,
+        poll_offset: float | None = None,
     ) -> None:
         """Initialize."""
         self.client = client
+        self.image_cache = EversoloImageCache(
+            hass,
+            IMAGE_CACHE_MAX_BYTES,
+            disk_path=image_cache_path(hass, config_entry.entry_id),
+            disk_max_bytes=IMAGE_CACHE_DISK_MAX_BYTES,
+        )
+        self._scheduler = EndpointScheduler(POLL_TIERS)
+        self._interval = AdaptivePollInterval()
+        self.breaker = CircuitBreaker()
+        # Monotonic time the device last answered a poll
+        self._last_answer: float | None = None
+        # Time each endpoint's current value was requested
+        self.fetched_at: dict[str, datetime] = {}
+        # Top-level keys of data that changed in the last update
+        self.changed_keys: set[str] = set()
+        # Monotonic time device info is fetched next, once per session at first
+        self._device_info_due = 0.0
+        # Monotonic time capabilities may be probed next, and the wait
+        # after the next failed probe
+        self._probe_due = 0.0
+        self._probe_retry = PROBE_RETRY_MIN
+        # Optimistic values by (key, path) as (expected value, deadline)
+        self._optimistic: dict[tuple[str, tuple[str, ...]], tuple[Any, float]] = {}
+        # Last value the device reported per key, without optimistic values
+        self._confirmed: dict[str, Any] = {}
         super().__init__(
             hass=hass,
             logger=LOGGER,
+            config_entry=config_entry,
             name=DOMAIN,
             update_interval=timedelta(seconds=DEFAULT_UPDATE_INTERVAL),
+            always_update=False,
         )
         self.data = {}
+        self.playback = EversoloPlaybackState()
+        self._snapshot = snapshot_store(hass, self.config_entry.entry_id)
+        self._apply_capabilities()
+        if poll_offset is not None:
+            # Polls fire at this fraction past the whole second. Replacing
+            # the random offset of DataUpdateCoordinator staggers devices.
+            self._microsecond = poll_offset
 
     async def _async_update_data(self):
-        """Update data via library."""
+        """Update data via library, recording the duration of the cycle."""
+        interval = self.update_interval.total_seconds()
+        start = time.perf_counter()
         try:
-            data = await self.client.async_get_data()
+            return await self._async_poll(self._cycle_deadline(interval))
+        finally:
+            duration = time.perf_counter() - start
+            self.client.metrics.record_cycle(duration, interval)
+            if duration > interval:
+                LOGGER.debug(
+                    "Poll took %.2f s, longer than the %.1f s interval",
+                    duration,
+                    interval,
+                )
 
-            if not all(
-                key in self.config_entry.data
-                for key in (CONF_NET_MAC, CONF_MODEL, CONF_FIRMWARE, CONF_ABLE_REMOTE_BOOT)
-            ):
+    def _cycle_deadline(self, interval: float) -> float:
+        """Return how long a poll waits for slow endpoints."""
+        return interval * POLL_CYCLE_DEADLINE_FRACTION
+
+    async def _async_poll(self, deadline: float):
+        """Fetch the due endpoints and merge them into data.
+
+        Endpoints that fail or are pending at the deadline keep their last
+        value for up to STALE_DATA_TTL, and endpoints that keep failing
+        are skipped by the circuit breaker. The playback state is awaited
+        past the deadline, until its own timeout. A poll only fails once the
+        device has not answered for STALE_DATA_TTL, counted from the
+        restore of the snapshot if it never answered since.
+        """
+        requested_at = dt_util.utcnow()
+        self.changed_keys = set()
+        probe = (
+            self._capabilities_outdated() and time.monotonic() >= self._probe_due
+        )
+        try:
+            if probe:
+                supported, data = await self.client.async_probe_capabilities()
+            else:
+                requested = self.breaker.allow(self._scheduler.due())
+                data = {}
+                try:
+                    data = await self.client.async_get_data(
+                        requested,
+                        deadline=deadline,
+                        always_wait=("music_control_state",),
+                    )
+                finally:
+                    # Also when the poll fails or is cancelled, so a circuit
+                    # let through half-open does not stay half-open
+                    self.breaker.record(requested, data)
+            self._scheduler.mark_fetched(data)
+
+            if time.monotonic() >= self._device_info_due:
                 await self._async_fetch_and_store_device_info()
 
-            return data
+            if probe:
+                self._store_capabilities(supported)
+
+            data = self._merge(data, requested_at)
         except EversoloApiClientAuthenticationError as exception:
+            self._set_interval(self._interval.on_failure())
             raise ConfigEntryAuthFailed(exception) from exception
         except EversoloApiClientError as exception:
-            raise UpdateFailed(exception) from exception
+            if probe:
+                self._probe_failed()
+            self._set_interval(self._interval.on_failure())
+            if (
+                self._last_answer is None
+                or time.monotonic() - self._last_answer > STALE_DATA_TTL
+            ):
+                raise UpdateFailed(exception) from exception
+            LOGGER.debug("Poll failed, serving the last data: %s", exception)
+            data = self._expire_stale(self.data)
+            self._update_playback(data)
+            return data
+
+        self._last_answer = time.monotonic()
+        data = self._expire_stale(data)
+        self._update_playback(data)
+        music_control_state = data.get("music_control_state") or {}
+        self._set_interval(
+            self._interval.on_success(
+                int(music_control_state.get("state", -1)))
+        )
+        return data
+
+    def data_age(self, key: str) -> float | None:
+        """Return the age of an endpoint's value in seconds, None if unknown."""
+        if (fetched_at := self.fetched_at.get(key)) is None:
+            return None
+        return (dt_util.utcnow() - fetched_at).total_seconds()
+
+    def _expire_stale(self, data: dict) -> dict:
+        """Drop values not refreshed within their poll interval plus STALE_DATA_TTL."""
+        expired = [
+            key
+            for key in data
+            if (age := self.data_age(key)) is not None
+            and age > POLL_TIERS.get(key, 0) + STALE_DATA_TTL
+        ]
+        if not expired:
+            return data
+
+        LOGGER.debug("Dropping values older than %s s: %s", STALE_DATA_TTL, expired)
+        for key in expired:
+            del self.fetched_at[key]
+        self.changed_keys.update(expired)
+        return {key: value for key, value in data.items() if key not in expired}
+
+    def _merge(self, fetched: dict, requested_at: datetime) -> dict:
+        """Merge fetched endpoint values into the current data.
+
+        Endpoints that failed this cycle keep their previous value. A value
+        requested before the one already stored (e.g. from an overlapping
+        refresh that finished late) is discarded. Keys whose value differs
+        from before are collected in changed_keys.
+        """
+        data = {**(self.data or {})}
+        for key, value in fetched.items():
+            if (previous := self.fetched_at.get(key)) and previous > requested_at:
+                LOGGER.debug("Discarding out-of-order value for %s", key)
+                continue
+            self._confirmed[key] = value
+            value = self._reconcile(key, value)
+            if data.get(key) != value:
+                self.changed_keys.add(key)
+            data[key] = value
+            self.fetched_at[key] = requested_at
+
+        if not self.changed_keys.isdisjoint(SNAPSHOT_KEYS):
+            self._snapshot.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+        return data
+
+    @callback
+    def _snapshot_data(self) -> dict:
+        """Return the slow-changing data to persist, without derived values."""
+        return {
+            key: {
+                name: value
+                for name, value in self.data[key].items()
+                if not name.startswith("transformed_")
+            }
+            if isinstance(self.data[key], dict)
+            else self.data[key]
+            for key in SNAPSHOT_KEYS
+            if key in self.data
+        }
+
+    async def async_restore_snapshot(self) -> bool:
+        """Restore the data persisted by a previous run, return if there was any.
+
+        The restored data counts as an answer of the device at the time of
+        the restore, so it is served for up to STALE_DATA_TTL while the
+        device does not answer.
+        """
+        if not (snapshot := await self._snapshot.async_load()):
+            return False
+
+        data = self.client.restore_data(
+            {
+                key: value
+                for key, value in snapshot.items()
+                if key in SNAPSHOT_KEYS and self.supports(key)
+            }
+        )
+        LOGGER.debug("Restored snapshot of %s", ", ".join(data))
+        self._confirmed.update(data)
+        self.changed_keys = set(data)
+        self._set_data({**self.data, **data})
+        self._last_answer = time.monotonic()
+        return True
+
+    def _update_playback(self, data: dict) -> None:
+        """Re-parse the playback state if its source data changed."""
+        if not self.changed_keys.isdisjoint(PLAYBACK_KEYS):
+            self.playback = EversoloPlaybackState.from_data(data, self.client)
+
+    @callback
+    def _set_data(self, data: dict) -> None:
+        """Replace data outside of a poll and notify entities."""
+        self._update_playback(data)
+        self.data = data
+        self.async_update_listeners()
+
+    def _reconcile(self, key: str, value: Any) -> Any:
+        """Apply pending optimistic values to a freshly fetched value.
+
+        An optimistic value is dropped once the device confirms it. Until
+        the deadline passes it overrides the fetched value, as the device
+        may not have applied the command yet; after that the device wins.
+        """
+        now = time.monotonic()
+        for (optimistic_key, path), (expected, deadline) in list(
+            self._optimistic.items()
+        ):
+            if optimistic_key != key:
+                continue
+            if _get_path(value, path) == expected:
+                del self._optimistic[(key, path)]
+            elif now >= deadline:
+                LOGGER.debug(
+                    "Device did not confirm %s %s, rolling back", key, path)
+                del self._optimistic[(key, path)]
+            else:
+                value = _set_path(value, path, expected)
+        return value
+
+    @callback
+    def async_set_optimistic(
+        self, key: str, path: tuple[str, ...], value: Any
+    ) -> None:
+        """Patch data with the expected result of a command and notify entities."""
+        self._optimistic[(key, path)] = (
+            value,
+            time.monotonic() + OPTIMISTIC_UPDATE_TIMEOUT,
+        )
+        self.changed_keys = {key}
+        self._set_data(
+            {**self.data, key: _set_path(self.data.get(key), path, value)})
+
+    async def async_optimistic_command(
+        self,
+        command: Awaitable[Any],
+        key: str,
+        path: tuple[str, ...],
+        value: Any,
+    ) -> Any:
+        """Run a command, showing its expected result right away.
+
+        If the command fails, the value the device last reported is
+        restored, rather than an optimistic value of an earlier command.
+        Returns the result of the command.
+        """
+        self.async_set_optimistic(key, path, value)
+        try:
+            return await command
+        except EversoloApiClientError:
+            self._optimistic.pop((key, path), None)
+            confirmed = _get_path(self._confirmed.get(key), path)
+            self.changed_keys = {key}
+            self._set_data(
+                {**self.data, key: _set_path(self.data.get(key), path, confirmed)})
+            raise
+
+    async def async_refresh_endpoints(self, endpoints: Iterable[str]) -> None:
+        """Fetch only the given endpoints and merge them into data.
+
+        Used after a command, which can only change the endpoints it
+        affects. Failures are logged; the next scheduled poll retries.
+        """
+        requested_at = dt_util.utcnow()
+        self._snap_back()
+        try:
+            fetched = await self.client.async_get_data(list(endpoints))
+        except EversoloApiClientError as exception:
+            LOGGER.debug("Partial refresh of %s failed: %s", endpoints, exception)
+            return
+
+        # The device answered, so it is available again right away
+        self._last_answer = time.monotonic()
+        self._scheduler.mark_fetched(fetched)
+        self.breaker.record(fetched, fetched)
+        self.changed_keys = set()
+        data = self._merge(fetched, requested_at)
+        if self.changed_keys or not self.last_update_success:
+            self.last_update_success = True
+            self.last_exception = None
+            self._set_data(data)
+
+    async def async_first_refresh(self) -> None:
+        """Run the first refresh, failing fast if the device is unreachable.
+
+        Meant to run in the background during setup. Instead of waiting
+        out the request timeout, an unreachable device is marked as
+        failed right away, unless a snapshot was restored, which is served
+        until polls fail; scheduled polls keep trying with backoff.
+        """
+        if not await self.client.async_check_connection(CONNECT_CHECK_TIMEOUT):
+            LOGGER.info(
+                "Eversolo device is offline, polling continues in the background")
+            self._set_interval(self._interval.on_failure())
+            if self._last_answer is None:
+                self.last_update_success = False
+                self.async_update_listeners()
+            return
+
+        await self.async_refresh()
+
+    async def async_request_refresh(self) -> None:
+        """Request a refresh of all endpoints, e.g. after a command."""
+        self._scheduler.invalidate()
+        self._snap_back()
+        await super().async_request_refresh()
+
+    def supports(self, endpoint: str) -> bool:
+        """Return whether the device supports an endpoint, True until probed."""
+        capabilities = self.config_entry.data.get(CONF_CAPABILITIES)
+        return capabilities is None or endpoint in capabilities
+
+    def _capabilities_outdated(self) -> bool:
+        """Return whether capabilities were never probed or the firmware changed."""
+        data = self.config_entry.data
+        return CONF_CAPABILITIES not in data or data.get(
+            CONF_CAPABILITIES_FIRMWARE) != data.get(CONF_FIRMWARE)
+
+    def _probe_failed(self) -> None:
+        """Wait before probing again, longer after every failed probe."""
+        LOGGER.debug("Probe failed, retrying in %s s", self._probe_retry)
+        self._probe_due = time.monotonic() + self._probe_retry
+        self._probe_retry = min(self._probe_retry * 2, PROBE_RETRY_MAX)
+
+    def _store_capabilities(self, supported: set[str]) -> None:
+        """Persist the supported endpoints with the firmware they were probed on."""
+        LOGGER.info(
+            "Probed %s firmware %s, supported endpoints: %s",
+            self.config_entry.data.get(CONF_MODEL),
+            self.config_entry.data.get(CONF_FIRMWARE),
+            ", ".join(sorted(supported)),
+        )
+        new_data = {
+            **self.config_entry.data,
+            CONF_CAPABILITIES: sorted(supported),
+            CONF_CAPABILITIES_FIRMWARE: self.config_entry.data.get(CONF_FIRMWARE),
+        }
+        self._probe_retry = PROBE_RETRY_MIN
+        if new_data != self.config_entry.data:
+            self.hass.config_entries.async_update_entry(
+                self.config_entry, data=new_data)
+            self._apply_capabilities()
+
+    def _apply_capabilities(self) -> None:
+        """Poll only the endpoints the device supports."""
+        intervals = {
+            endpoint: interval
+            for endpoint, interval in POLL_TIERS.items()
+            if self.supports(endpoint)
+        }
+        if intervals != self._scheduler.intervals:
+            self._scheduler.set_intervals(intervals)
+
+    def _set_interval(self, seconds: float) -> None:
+        """Apply a new poll interval, effective from the next scheduled poll."""
+        if self.update_interval.total_seconds() != seconds:
+            LOGGER.debug("Poll interval is now %.1f s", seconds)
+            self.update_interval = timedelta(seconds=seconds)
+
+    def _snap_back(self) -> None:
+        """Poll at the command interval from now on, e.g. after a command.
+
+        Setting update_interval does not move a poll that is already
+        scheduled, which can be a backoff away, so that poll is
+        rescheduled if the interval got shorter.
+        """
+        previous = self.update_interval
+        self._set_interval(self._interval.on_command())
+        if self._unsub_refresh is not None and self.update_interval < previous:
+            self._schedule_refresh()
 
     async def _async_fetch_and_store_device_info(self) -> None:
-        """Fetch and persist device info."""
+        """Fetch device info and persist it if it changed.
+
+        Runs on the first successful poll of a session and then every
+        DEVICE_INFO_TTL, so firmware updates are noticed. Fields a firmware
+        does not report keep their previous value rather than causing a
+        fetch on every poll.
+        """
         try:
             device_info = await self.client.async_get_device_model()
             new_data = {**self.config_entry.data}
 
             if net_mac := device_info.get("net_mac"):
                 new_data[CONF_NET_MAC] = net_mac
-                LOGGER.info("Stored MAC address for Wake-on-LAN: %s", net_mac)
 
             if model := device_info.get("model"):
                 new_data[CONF_MODEL] = model
@@ -83,13 +506,21 @@ class EversoloDataUpdateCoordinator(DataUpdateCoordinator):
 
             if "ableRemoteBoot" in device_info:
                 new_data[CONF_ABLE_REMOTE_BOOT] = device_info["ableRemoteBoot"]
-
-            self.hass.config_entries.async_update_entry(
-                self.config_entry,
-                data=new_data,
-            )
         except Exception:
             LOGGER.debug("Could not fetch device info")
+            self._device_info_due = time.monotonic() + DEVICE_INFO_RETRY_INTERVAL
+            return
+
+        self._device_info_due = time.monotonic() + DEVICE_INFO_TTL
+        if new_data == self.config_entry.data:
+            return
+
+        if net_mac and net_mac != self.config_entry.data.get(CONF_NET_MAC):
+            LOGGER.info("Stored MAC address for Wake-on-LAN: %s", net_mac)
+        self.hass.config_entries.async_update_entry(
+            self.config_entry,
+            data=new_data,
+        )
 
     async def async_send_wol(self) -> None:
         """Send Wake-on-LAN magic packet to power on the device."""
@@ -97,8 +528,28 @@ class EversoloDataUpdateCoordinator(DataUpdateCoordinator):
         if net_mac:
             LOGGER.info("Sending Wake-on-LAN magic packet to %s", net_mac)
             await self.hass.async_add_executor_job(send_magic_packet, net_mac)
+            # Poll again soon to notice the device coming up
+            self._snap_back()
         else:
             LOGGER.warning(
                 "No MAC address available for Wake-on-LAN - "
                 "device must be powered on once to fetch MAC"
             )
+
+
+def _get_path(value: Any, path: tuple[str, ...]) -> Any:
+    """Return the value at path in nested dicts, None if missing."""
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _set_path(value: Any, path: tuple[str, ...], new_value: Any) -> Any:
+    """Return a copy of nested dicts with the value at path replaced."""
+    if not path:
+        return new_value
+    value = dict(value) if isinstance(value, dict) else {}
+    value[path[0]] = _set_path(value.get(path[0]), path[1:], new_value)
+    return value
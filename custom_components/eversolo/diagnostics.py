@@ -0,0 +1,30 @@
+"""Diagnostics support for eversolo."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_NET_MAC, DOMAIN
+from .coordinator import EversoloDataUpdateCoordinator
+
+TO_REDACT = {CONF_NET_MAC}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics of a config entry, including request metrics."""
+    coordinator: EversoloDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": async_redact_data(entry.data, TO_REDACT),
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": coordinator.update_interval.total_seconds(),
+        "metrics": coordinator.client.metrics.as_dict(),
+        "queue_depth": coordinator.client.queue_depth,
+        "circuits": coordinator.breaker.as_dict(),
+        "data_age": {key: coordinator.data_age(key) for key in coordinator.data},
+    }
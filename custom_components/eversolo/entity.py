@@ -1,6 +1,8 @@
 """EversoloEntity class."""
 from __future__ import annotations
 
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -13,14 +15,36 @@ class EversoloEntity(CoordinatorEntity):
 
     _attr_attribution = ATTRIBUTION
 
-    def __init__(self, coordinator: EversoloDataUpdateCoordinator) -> None:
+    # Keys of coordinator.data the entity state depends on, None for all keys
+    _data_keys: tuple[str, ...] | None = None
+
+    def __init__(
+        self,
+        coordinator: EversoloDataUpdateCoordinator,
+        config_entry: ConfigEntry | None = None,
+    ) -> None:
         """Initialize."""
         super().__init__(coordinator)
-        self._attr_unique_id = coordinator.config_entry.entry_id
+        self._config_entry = config_entry or coordinator.config_entry
+        self._last_update_success = coordinator.last_update_success
+        self._attr_unique_id = self._config_entry.entry_id
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, self.unique_id)},
             name=NAME,
-            model=coordinator.config_entry.data.get(CONF_MODEL),
-            sw_version=coordinator.config_entry.data.get(CONF_FIRMWARE),
+            model=self._config_entry.data.get(CONF_MODEL),
+            sw_version=self._config_entry.data.get(CONF_FIRMWARE),
             manufacturer=NAME,
         )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if availability or a dependent key changed."""
+        if (
+            self._data_keys is not None
+            and self.coordinator.last_update_success == self._last_update_success
+            and self.coordinator.changed_keys.isdisjoint(self._data_keys)
+        ):
+            return
+
+        self._last_update_success = self.coordinator.last_update_success
+        super()._handle_coordinator_update()
@@ -0,0 +1,137 @@
+"""Album art cache for eversolo."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from functools import partial
+import hashlib
+import os
+
+from homeassistant.core import HomeAssistant
+
+from .api import SharedFetch
+from .const import LOGGER
+
+
+def image_hash(key: str) -> str:
+    """Return a short hash identifying the artwork stored under key."""
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+class EversoloImageCache:
+    """Album art cache bounded by size, in memory and optionally on disk.
+
+    Images are keyed by song id or path, so every track is fetched from
+    the device once, no matter how many clients display it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_bytes: int,
+        disk_path: str | None = None,
+        disk_max_bytes: int = 0,
+    ) -> None:
+        """Initialize the cache."""
+        self._hass = hass
+        self._max_bytes = max_bytes
+        self._disk_path = disk_path if disk_max_bytes > 0 else None
+        self._disk_max_bytes = disk_max_bytes
+        self._images: OrderedDict[str, tuple[bytes, str | None]] = OrderedDict()
+        self._size = 0
+        self._pending: dict[str, SharedFetch] = {}
+
+    async def async_get(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[tuple[bytes, str | None]]],
+    ) -> tuple[bytes, str | None]:
+        """Return the image for key, fetching it on a cache miss.
+
+        Concurrent requests for the same key share a single fetch, which
+        goes on while any of them still waits for it.
+        """
+        if (image := self._images.get(key)) is not None:
+            self._images.move_to_end(key)
+            return image
+
+        if (shared := self._pending.get(key)) is None:
+            shared = self._pending[key] = SharedFetch(
+                partial(self._async_load, key, fetch), partial(self._release, key))
+        return await shared.async_wait()
+
+    async def _async_load(self, key, fetch) -> tuple[bytes, str | None]:
+        """Load an image from disk or the device and store it."""
+        image = None
+        if self._disk_path is not None:
+            image = await self._hass.async_add_executor_job(self._read_disk, key)
+
+        if image is None:
+            image = await fetch()
+            if self._disk_path is not None and image[0]:
+                await self._hass.async_add_executor_job(
+                    self._write_disk, key, *image)
+
+        self._put(key, image)
+        return image
+
+    def _release(self, key: str, shared: SharedFetch) -> None:
+        """Stop sharing a load that finished or is cancelled."""
+        if self._pending.get(key) is shared:
+            del self._pending[key]
+
+    def _put(self, key: str, image: tuple[bytes, str | None]) -> None:
+        """Store an image in memory, evicting least recently used images.
+
+        Empty images, e.g. from a failed response, are not stored, so the
+        next request fetches the art again.
+        """
+        size = len(image[0])
+        if not size or size > self._max_bytes:
+            return
+
+        self._images[key] = image
+        self._size += size
+        while self._size > self._max_bytes:
+            _, (content, _) = self._images.popitem(last=False)
+            self._size -= len(content)
+
+    def _file_path(self, key: str) -> str:
+        """Return the path of an image on disk."""
+        return os.path.join(
+            self._disk_path, hashlib.sha256(key.encode()).hexdigest())
+
+    def _read_disk(self, key: str) -> tuple[bytes, str | None] | None:
+        """Read an image from the disk cache.
+
+        The first line of the file holds the content type.
+        """
+        try:
+            with open(self._file_path(key), "rb") as file:
+                content_type = file.readline().decode().strip()
+                content = file.read()
+        except OSError:
+            return None
+
+        return content, content_type or None
+
+    def _write_disk(self, key: str, content: bytes, content_type: str | None) -> None:
+        """Write an image to the disk cache, evicting the oldest files."""
+        try:
+            os.makedirs(self._disk_path, exist_ok=True)
+            with open(self._file_path(key), "wb") as file:
+                file.write(f"{content_type or ''}\n".encode())
+                file.write(content)
+
+            entries = sorted(
+                (entry for entry in os.scandir(self._disk_path) if entry.is_file()),
+                key=lambda entry: entry.stat().st_mtime,
+            )
+            total = sum(entry.stat().st_size for entry in entries)
+            for entry in entries:
+                if total <= self._disk_max_bytes:
+                    break
+                total -= entry.stat().st_size
+                os.remove(entry.path)
+        except OSError as exception:
+            LOGGER.debug("Could not write album art to disk: %s", exception)
@@ -11,6 +11,7 @@ from homeassistant.components.light import (
     ColorMode,
     ATTR_BRIGHTNESS,
 )
+from homeassistant.config_entries import ConfigEntry
 
 from .const import DOMAIN, LOGGER
 from .coordinator import EversoloDataUpdateCoordinator
@@ -37,6 +38,10 @@ class EversoloLightDescriptionMixin(Generic[_EversoloDataUpdateCoordinatorT]):
         _EversoloDataUpdateCoordinatorT], Coroutine[Any, Any, None]] | None = None
     turn_off: Callable[[_EversoloDataUpdateCoordinatorT],
                        Coroutine[Any, Any, None]] | None = None
+    # Brightness the device reports after setting a brightness, if it
+    # stores fewer levels than 0..255
+    quantize_brightness: Callable[
+        [_EversoloDataUpdateCoordinatorT, int], int] | None = None
 
 
 @dataclass
@@ -59,6 +64,9 @@ ENTITY_DESCRIPTIONS = [
         is_light_on_key="is_display_on",
         turn_on=lambda coordinator: coordinator.client.async_trigger_turn_screen_on(),
         turn_off=lambda coordinator: coordinator.client.async_trigger_turn_screen_off(),
+        quantize_brightness=lambda coordinator, brightness: coordinator.client.quantize_display_brightness(
+            brightness
+        ),
     ),
     EversoloLightDescription[EversoloDataUpdateCoordinator](
         key="knob",
@@ -83,8 +91,10 @@ async def async_setup_entry(hass, entry, async_add_devices):
         EversoloLight(
             coordinator=coordinator,
             entity_description=entity_description,
+            config_entry=entry,
         )
         for entity_description in ENTITY_DESCRIPTIONS
+        if coordinator.supports(entity_description.brightness_key)
     )
 
 
@@ -95,16 +105,22 @@ class EversoloLight(EversoloEntity, LightEntity):
         self,
         coordinator: EversoloDataUpdateCoordinator,
         entity_description: LightEntityDescription,
+        config_entry: ConfigEntry | None = None,
     ) -> None:
         """Initialize the Light class."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, config_entry)
         self.entity_description = entity_description
         self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
         self._attr_color_mode = ColorMode.BRIGHTNESS
         self._attr_unique_id = (
-            f"{coordinator.config_entry.entry_id}_{entity_description.key}"
+            f"{self._config_entry.entry_id}_{entity_description.key}"
         )
         self.last_brightness = None
+        self._data_keys = tuple(
+            key
+            for key in (entity_description.brightness_key, entity_description.is_light_on_key)
+            if key is not None
+        )
 
     @property
     def is_on(self) -> bool:
@@ -137,22 +153,62 @@ class EversoloLight(EversoloEntity, LightEntity):
 
         if not has_attr_brightness:
             if self.entity_description.turn_on is not None:
-                await self.entity_description.turn_on(self.coordinator)
+                await self._async_optimistic_on_off(
+                    self.entity_description.turn_on(self.coordinator), True
+                )
 
             if self.entity_description.set_brightness is not None:
                 brightness = self.last_brightness if self.last_brightness is not None else 128
-                await self.entity_description.set_brightness(self.coordinator, brightness)
+                await self._async_optimistic_brightness(brightness)
 
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_refresh_endpoints(self._data_keys)
             return
 
         brightness = kwargs.get(ATTR_BRIGHTNESS, 255)
         self.last_brightness = brightness
-        await self.entity_description.set_brightness(self.coordinator, brightness)
-        await self.coordinator.async_request_refresh()
+        if await self._async_optimistic_brightness(brightness):
+            await self.coordinator.async_refresh_endpoints(self._data_keys)
 
     async def async_turn_off(self, **_: any) -> None:
         """Turn off the Light."""
         if self.entity_description.turn_off is not None:
-            await self.entity_description.turn_off(self.coordinator)
-        await self.coordinator.async_request_refresh()
+            if self.entity_description.is_light_on_key is not None:
+                await self._async_optimistic_on_off(
+                    self.entity_description.turn_off(self.coordinator), False
+                )
+            else:
+                await self.coordinator.async_optimistic_command(
+                    self.entity_description.turn_off(self.coordinator),
+                    self.entity_description.brightness_key,
+                    (),
+                    0,
+                )
+        await self.coordinator.async_refresh_endpoints(self._data_keys)
+
+    async def _async_optimistic_brightness(self, brightness: int) -> bool:
+        """Set the brightness and show it before the device confirms it.
+
+        The optimistic value is the brightness the device will report, so
+        the next poll confirms it instead of waiting for the timeout.
+        """
+        expected = brightness
+        if self.entity_description.quantize_brightness is not None:
+            expected = self.entity_description.quantize_brightness(
+                self.coordinator, brightness)
+        return await self.coordinator.async_optimistic_command(
+            self.entity_description.set_brightness(
+                self.coordinator, brightness),
+            self.entity_description.brightness_key,
+            (),
+            expected,
+        )
+
+    async def _async_optimistic_on_off(self, command, is_on: bool) -> None:
+        """Switch the Light and show the new state before the device confirms it."""
+        if self.entity_description.is_light_on_key is None:
+            await command
+            return
+
+        await self.coordinator.async_optimistic_command(
+            command, self.entity_description.is_light_on_key, (), is_on
+        )
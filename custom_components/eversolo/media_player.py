@@ -1,18 +1,30 @@
 """Media Player platform for eversolo."""
 from __future__ import annotations
 
-import datetime as dt
-
 from homeassistant.components.media_player import (
     MediaPlayerDeviceClass,
     MediaPlayerEntity,
     MediaPlayerEntityFeature,
     MediaPlayerState,
 )
-
-from .const import CONF_ABLE_REMOTE_BOOT, DOMAIN, LOGGER
+from homeassistant.core import callback
+
+from .api import EversoloApiClientError
+from .const import (
+    CONF_ABLE_REMOTE_BOOT,
+    DOMAIN,
+    LOGGER,
+    MEDIA_POSITION_TOLERANCE,
+)
 from .coordinator import EversoloDataUpdateCoordinator
 from .entity import EversoloEntity
+from .image_cache import image_hash
+
+PLAY_STATES = {
+    0: MediaPlayerState.IDLE,
+    3: MediaPlayerState.PLAYING,
+    4: MediaPlayerState.PAUSED,
+}
 
 SUPPORT_FEATURES = (
     MediaPlayerEntityFeature.TURN_OFF
@@ -39,16 +51,18 @@ async def async_setup_entry(hass, entry, async_add_devices):
 class EversoloMediaPlayer(EversoloEntity, MediaPlayerEntity):
     """Eversolo Media Player."""
 
+    _data_keys = ("music_control_state", "input_output_state")
+
     def __init__(self, coordinator: EversoloDataUpdateCoordinator, config_entry):
         """Initialize the Media Player."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, config_entry)
         self._attr_device_class = MediaPlayerDeviceClass.RECEIVER
         self._attr_supported_features = SUPPORT_FEATURES
-        self._attr_unique_id = f"{
-            coordinator.config_entry.entry_id}_media_player"
-        self._config_entry = config_entry
+        self._attr_unique_id = f"{config_entry.entry_id}_media_player"
         self._name = "Eversolo"
         self._state = None
+        self._position_sampled_at = None
+        self._position_playing = False
 
     @property
     def available(self) -> bool:
@@ -69,24 +83,14 @@ class EversoloMediaPlayer(EversoloEntity, MediaPlayerEntity):
         if not self.coordinator.last_update_success:
             return MediaPlayerState.OFF
 
-        music_control_state = self.coordinator.data.get(
-            "music_control_state", None)
+        play_state = self.coordinator.playback.play_state
 
-        if music_control_state is None:
+        if play_state is None:
             return MediaPlayerState.OFF
 
-        state = int(music_control_state.get("state", -1))
-
-        if state == 0:
-            self._state = MediaPlayerState.IDLE
-        elif state == 3:
-            self._state = MediaPlayerState.PLAYING
-            self._attr_media_position_updated_at = dt.datetime.now()
-        elif state == 4:
-            self._state = MediaPlayerState.PAUSED
-        else:
-            LOGGER.debug("Unknown state: %s", state)
-            self._state = None
+        self._state = PLAY_STATES.get(play_state)
+        if self._state is None:
+            LOGGER.debug("Unknown state: %s", play_state)
 
         return self._state
 
@@ -98,226 +102,133 @@ class EversoloMediaPlayer(EversoloEntity, MediaPlayerEntity):
     @property
     def volume_level(self):
         """Volume level of the Media Player in range 0..1."""
-        music_control_state = self.coordinator.data.get(
-            "music_control_state", None)
-
-        if music_control_state is None:
-            return None
-
-        current_volume = music_control_state.get("volumeData", {}).get(
-            "currenttVolume", None
-        )
-        max_volume = music_control_state.get(
-            "volumeData", {}).get("maxVolume", None)
-
-        if current_volume is None or max_volume is None:
-            LOGGER.debug(
-                "Current volume or max volume invalid in music control state: %s",
-                music_control_state,
-            )
-            return None
-
-        return float(current_volume) / float(max_volume)
+        return self.coordinator.playback.volume_level
 
     @property
     def is_volume_muted(self):
         """Return muted state."""
-        music_control_state = self.coordinator.data.get(
-            "music_control_state", None)
-
-        if music_control_state is None:
-            return None
-
-        return music_control_state.get("volumeData", {}).get("isMute", None)
+        return self.coordinator.playback.is_volume_muted
 
     @property
     def source(self):
         """Return the current input source."""
-        input_output_state = self.coordinator.data.get(
-            "input_output_state", None)
-
-        if input_output_state is None:
-            return None
-
-        sources = self.coordinator.data.get("input_output_state", {}).get(
-            "transformed_sources", None
-        )
-
-        if sources is None:
-            return None
-
-        input_index = input_output_state.get("inputIndex", -1)
-        if input_index < 0 or input_index >= len(sources):
-            LOGGER.debug("Input index %s is out of range", input_index)
-            return None
-
-        return list(sources.values())[input_index]
+        return self.coordinator.playback.source
 
     @property
     def source_list(self):
         """List of available input sources."""
-        # NoneType object has no values
-        sources = self.coordinator.data.get("input_output_state", {}).get(
-            "transformed_sources", None
-        )
-
-        if sources is None:
-            return None
-
-        return list(sources.values())
+        return self.coordinator.playback.source_list
 
     @property
     def media_title(self):
         """Title of current playing media."""
-        music_control_state = self.coordinator.data.get(
-            "music_control_state", None)
-
-        if music_control_state is None:
-            return None
-
-        play_type = music_control_state.get("playType", None)
-
-        # Bluetooth or Spotify Connect
-        if play_type == 4 or play_type == 6:
-            return (
-                music_control_state.get("everSoloPlayInfo", {})
-                .get("everSoloPlayAudioInfo", {})
-                .get("songName", None)
-            )
-
-        # Internal Player
-        if play_type == 5:
-            return music_control_state.get("playingMusic", {}).get("title", None)
-
-        return None
+        return self.coordinator.playback.title
 
     @property
     def media_artist(self):
         """Artist of current playing media."""
-        music_control_state = self.coordinator.data.get(
-            "music_control_state", None)
-
-        if music_control_state is None:
-            return None
-
-        play_type = music_control_state.get("playType", None)
-
-        # Bluetooth or Spotify Connect
-        if play_type == 4 or play_type == 6:
-            return (
-                music_control_state.get("everSoloPlayInfo", {})
-                .get("everSoloPlayAudioInfo", {})
-                .get("artistName", None)
-            )
-
-        # Internal Player
-        if play_type == 5:
-            return music_control_state.get("playingMusic", {}).get("artist", None)
-
-        return None
+        return self.coordinator.playback.artist
 
     @property
     def media_album_name(self):
         """Album of current playing media."""
-        music_control_state = self.coordinator.data.get(
-            "music_control_state", None)
-
-        if music_control_state is None:
-            return None
-
-        play_type = music_control_state.get("playType", None)
-
-        # Bluetooth or Spotify Connect
-        if play_type == 4 or play_type == 6:
-            return (
-                music_control_state.get("everSoloPlayInfo", {})
-                .get("everSoloPlayAudioInfo", {})
-                .get("albumName", None)
-            )
-
-        # Internal Player
-        if play_type == 5:
-            return music_control_state.get("playingMusic", {}).get("album", None)
-
-        return None
+        return self.coordinator.playback.album
 
     @property
     def media_image_url(self):
         """Image url of current playing media."""
-        music_control_state = self.coordinator.data.get(
-            "music_control_state", None)
+        return self.coordinator.playback.image_url
 
-        if music_control_state is None:
+    @property
+    def media_image_hash(self):
+        """Hash of the current artwork, changes only when the artwork does."""
+        key = self.coordinator.playback.image_key
+        if key is None:
             return None
+        return image_hash(key)
 
-        play_type = music_control_state.get("playType", None)
+    async def async_get_media_image(self):
+        """Fetch the current artwork through the album art cache."""
+        key = self.coordinator.playback.image_key
+        url = self.coordinator.playback.image_url
+        if key is None:
+            return None, None
 
-        # Bluetooth or Spotify Connect
-        if play_type == 6:
-            album_url = music_control_state.get("everSoloPlayInfo", {}).get(
-                "icon", None
+        try:
+            return await self.coordinator.image_cache.async_get(
+                key, lambda: self.coordinator.client.async_get_image(url)
             )
-
-            if album_url is None or album_url == "":
-                return None
-
-            if not album_url.startswith("http"):
-                album_url = self.coordinator.client.create_image_url_by_path(
-                    album_url)
-
-            return album_url
-
-        # Internal Player
-        if play_type == 5:
-            album_art = music_control_state.get(
-                "playingMusic", {}).get("albumArt", None)
-
-            if album_art:
-                return album_art
-
-            song_id = music_control_state.get(
-                "playingMusic", {}).get("id", None)
-            if song_id is not None:
-                return self.coordinator.client.create_image_url_by_song_id(song_id)
-
-        return None
+        except EversoloApiClientError as exception:
+            LOGGER.debug("Could not fetch album art: %s", exception)
+            return None, None
 
     @property
     def media_duration(self):
         """Duration of current playing media in seconds."""
-        music_control_state = self.coordinator.data.get(
-            "music_control_state", None)
-
-        if music_control_state is None:
-            return None
-
-        duration = music_control_state.get("duration", None)
-
-        if duration is None or duration == 0:
-            return None
-
-        return duration / 1000
-
-    @property
-    def media_position(self):
-        """Position of current playing media in seconds."""
-        music_control_state = self.coordinator.data.get(
-            "music_control_state", None)
-
-        if music_control_state is None:
-            return None
+        return self.coordinator.playback.duration
+
+    async def async_added_to_hass(self) -> None:
+        """Anchor the media position when the entity is added."""
+        await super().async_added_to_hass()
+        self._update_media_position()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_media_position()
+        super()._handle_coordinator_update()
+
+    def _update_media_position(self) -> None:
+        """Re-anchor the media position when it deviates from the extrapolation.
+
+        The frontend interpolates the position from media_position and
+        media_position_updated_at, so both only change when the device
+        reports a jump (seek, track change, play/pause) rather than on
+        every poll.
+        """
+        playback = self.coordinator.playback
+        sampled_at = self.coordinator.fetched_at.get("music_control_state")
+
+        if playback.play_state is None or sampled_at is None:
+            self._attr_media_position = None
+            self._attr_media_position_updated_at = None
+            return
 
-        position = music_control_state.get("position", None)
+        # Ignore samples that are not newer than the last one seen
+        if self._position_sampled_at is not None and sampled_at <= self._position_sampled_at:
+            return
+        self._position_sampled_at = sampled_at
 
-        if position is None or position == 0:
-            return None
+        position = playback.position
+        if position is None:
+            self._attr_media_position = None
+            self._attr_media_position_updated_at = None
+            return
 
-        return position / 1000
+        is_playing = playback.play_state == 3
+
+        if (
+            self._attr_media_position is not None
+            and self._attr_media_position_updated_at is not None
+            and is_playing == self._position_playing
+        ):
+            expected = self._attr_media_position
+            if self._position_playing:
+                expected += (
+                    sampled_at - self._attr_media_position_updated_at
+                ).total_seconds()
+            if abs(position - expected) <= MEDIA_POSITION_TOLERANCE:
+                return
+
+        self._attr_media_position = position
+        self._attr_media_position_updated_at = sampled_at
+        self._position_playing = is_playing
 
     async def async_media_seek(self, position: float):
         """Seek the media to a specific location."""
-        await self.coordinator.client.async_seek_time(round(position * 1000))
-        await self.coordinator.async_request_refresh()
+        if await self.coordinator.client.async_seek_time(round(position * 1000)):
+            await self.coordinator.async_refresh_endpoints(
+                ("music_control_state",))
 
     async def async_turn_off(self):
         """Turn off Media Player."""
@@ -330,33 +241,45 @@ class EversoloMediaPlayer(EversoloEntity, MediaPlayerEntity):
 
     async def async_set_volume_level(self, volume: float) -> None:
         """Set volume level, range 0..1."""
-        music_control_state = self.coordinator.data.get(
-            "music_control_state", None)
+        playback = self.coordinator.playback
 
-        if music_control_state is None:
+        if playback.play_state is None:
             return
 
-        converted_volume = round(
-            volume * int(music_control_state.get("volumeData",
-                         {}).get("maxVolume", 0))
-        )
-        await self.coordinator.client.async_set_volume(converted_volume)
-        await self.coordinator.async_request_refresh()
+        converted_volume = round(volume * (playback.max_volume or 0))
+        if await self.coordinator.async_optimistic_command(
+            self.coordinator.client.async_set_volume(converted_volume),
+            "music_control_state",
+            ("volumeData", "currenttVolume"),
+            converted_volume,
+        ):
+            await self.coordinator.async_refresh_endpoints(
+                ("music_control_state",))
 
     async def async_volume_up(self):
         """Volume up the Media Player."""
         await self.coordinator.client.async_volume_up()
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_refresh_endpoints(
+            ("music_control_state",))
 
     async def async_volume_down(self):
         """Volume down Media Player."""
         await self.coordinator.client.async_volume_down()
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_refresh_endpoints(
+            ("music_control_state",))
 
     async def async_mute_volume(self, mute):
         """Send mute command."""
-        await self.coordinator.client.async_mute()
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_optimistic_command(
+            self.coordinator.client.async_mute()
+            if mute
+            else self.coordinator.client.async_unmute(),
+            "music_control_state",
+            ("volumeData", "isMute"),
+            mute,
+        )
+        await self.coordinator.async_refresh_endpoints(
+            ("music_control_state",))
 
     async def async_select_source(self, source):
         """Set the input source."""
@@ -367,40 +290,65 @@ class EversoloMediaPlayer(EversoloEntity, MediaPlayerEntity):
         if sources is None:
             return
 
-        try:
-            index, tag = next(
-                (index, key)
-                for index, key in enumerate(sources)
-                if sources[key] == source or key == source
-            )
-        except StopIteration:
+        if (entry := sources.by_name.get(source)) is not None:
+            index, tag = entry
+        elif (index := sources.by_tag.get(source)) is not None:
+            tag = source
+        else:
             raise ValueError(f"Source {source} not found")
 
-        await self.coordinator.client.async_set_input(index, tag)
+        await self.coordinator.async_optimistic_command(
+            self.coordinator.client.async_set_input(index, tag),
+            "input_output_state",
+            ("inputIndex",),
+            index,
+        )
+        await self.coordinator.async_refresh_endpoints(
+            ("input_output_state", "music_control_state"))
 
     async def async_media_play_pause(self):
         """Simulate play pause Media Player."""
-        await self.coordinator.client.async_toggle_play_pause()
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_optimistic_command(
+            self.coordinator.client.async_toggle_play_pause(),
+            "music_control_state",
+            ("state",),
+            4 if self._state is MediaPlayerState.PLAYING else 3,
+        )
+        await self.coordinator.async_refresh_endpoints(
+            ("music_control_state",))
 
     async def async_media_play(self):
         """Send play command."""
         if self._state is not MediaPlayerState.PLAYING:
-            await self.coordinator.client.async_toggle_play_pause()
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_optimistic_command(
+                self.coordinator.client.async_toggle_play_pause(),
+                "music_control_state",
+                ("state",),
+                3,
+            )
+            await self.coordinator.async_refresh_endpoints(
+                ("music_control_state",))
 
     async def async_media_pause(self):
         """Send pause command."""
         if self._state is MediaPlayerState.PLAYING:
-            await self.coordinator.client.async_toggle_play_pause()
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_optimistic_command(
+                self.coordinator.client.async_toggle_play_pause(),
+                "music_control_state",
+                ("state",),
+                4,
+            )
+            await self.coordinator.async_refresh_endpoints(
+                ("music_control_state",))
 
     async def async_media_next_track(self):
         """Send next track command."""
         await self.coordinator.client.async_next_title()
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_refresh_endpoints(
+            ("music_control_state",))
 
     async def async_media_previous_track(self):
         """Send the previous track command."""
         await self.coordinator.client.async_previous_title()
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_refresh_endpoints(
+            ("music_control_state",))
@@ -0,0 +1,219 @@
+"""Request and poll cycle metrics for eversolo."""
+from __future__ import annotations
+
+from bisect import bisect_left
+import time
+
+from .const import (
+    METRICS_LATENCY_BUCKETS,
+    REQUEST_TIMEOUT_MAX,
+    REQUEST_TIMEOUT_MIN,
+    RTT_ALPHA,
+    RTT_BETA,
+    RTT_K,
+)
+
+
+class LatencyHistogram:
+    """Count durations in fixed buckets instead of storing samples."""
+
+    __slots__ = ("buckets", "count", "counts", "total")
+
+    def __init__(self, buckets: tuple[float, ...] = METRICS_LATENCY_BUCKETS) -> None:
+        """Initialize the histogram with the upper bounds of its buckets in seconds."""
+        self.buckets = buckets
+        # One more count for durations above the last bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Count a duration."""
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, fraction: float) -> float | None:
+        """Estimate a percentile in seconds, interpolating within its bucket."""
+        if not self.count:
+            return None
+
+        rank = fraction * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        # Above the last bound there is no upper limit to interpolate to
+        return self.buckets[-1]
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean duration in seconds."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict:
+        """Return the histogram as a JSON serializable dict."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class RttEstimator:
+    """Smoothed round-trip time and the request timeout derived from it.
+
+    Follows RFC 6298: the timeout is srtt + K * rttvar, doubled after each
+    timeout until a request succeeds again.
+    """
+
+    __slots__ = ("backoff", "rttvar", "srtt")
+
+    def __init__(self) -> None:
+        """Initialize the estimator without samples."""
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+        self.backoff = 1
+
+    def observe(self, seconds: float) -> None:
+        """Update the estimate with the round-trip time of a successful request."""
+        if self.srtt is None:
+            self.srtt = seconds
+            self.rttvar = seconds / 2
+        else:
+            self.rttvar += RTT_BETA * (abs(self.srtt - seconds) - self.rttvar)
+            self.srtt += RTT_ALPHA * (seconds - self.srtt)
+        self.backoff = 1
+
+    def on_timeout(self) -> None:
+        """Double the timeout after a request timed out."""
+        if self.timeout() < REQUEST_TIMEOUT_MAX:
+            self.backoff *= 2
+
+    def timeout(self) -> float:
+        """Return the timeout for the next request in seconds."""
+        if self.srtt is None:
+            return REQUEST_TIMEOUT_MAX
+        timeout = max(self.srtt + RTT_K * self.rttvar, REQUEST_TIMEOUT_MIN)
+        return min(timeout * self.backoff, REQUEST_TIMEOUT_MAX)
+
+
+class EndpointMetrics:
+    """Latency, failures and last success of one endpoint."""
+
+    __slots__ = ("errors", "last_success", "latency", "rtt", "timeouts")
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.latency = LatencyHistogram()
+        self.rtt = RttEstimator()
+        self.timeouts = 0
+        self.errors = 0
+        # Unix timestamp of the last successful request
+        self.last_success: float | None = None
+
+    def as_dict(self) -> dict:
+        """Return the metrics as a JSON serializable dict."""
+        return {
+            "latency": self.latency.as_dict(),
+            "srtt": self.rtt.srtt,
+            "timeout": self.rtt.timeout(),
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "last_success": self.last_success,
+        }
+
+
+class EversoloMetrics:
+    """Metrics of the requests to a device and of its poll cycles."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.cycle = LatencyHistogram()
+        self.cycle_overruns = 0
+        self.last_cycle: float | None = None
+        # Endpoints left behind by a poll at its deadline, by data key
+        self.abandoned: dict[str, int] = {}
+        # Time requests waited for the rate limiter, by priority
+        self.queue_wait: dict[int, LatencyHistogram] = {}
+        self.max_queue_depth = 0
+
+    def endpoint(self, name: str) -> EndpointMetrics:
+        """Return the metrics of an endpoint, created on first use."""
+        if (metrics := self.endpoints.get(name)) is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def record_success(self, name: str, seconds: float) -> None:
+        """Record a successful request and its latency."""
+        metrics = self.endpoint(name)
+        metrics.latency.observe(seconds)
+        metrics.rtt.observe(seconds)
+        metrics.last_success = time.time()
+
+    def record_timeout(self, name: str) -> None:
+        """Record a request that timed out."""
+        metrics = self.endpoint(name)
+        metrics.timeouts += 1
+        metrics.rtt.on_timeout()
+
+    def record_cancelled(self, name: str, seconds: float) -> None:
+        """Record a request cancelled in flight, e.g. at the poll deadline.
+
+        It took at least seconds, so that is a round-trip time sample if
+        it is above the estimate; otherwise it says nothing about the RTT.
+        """
+        rtt = self.endpoint(name).rtt
+        if rtt.srtt is None or seconds > rtt.srtt:
+            rtt.observe(seconds)
+
+    def record_abandoned(self, key: str) -> None:
+        """Record an endpoint a poll stopped waiting for."""
+        self.abandoned[key] = self.abandoned.get(key, 0) + 1
+
+    def record_error(self, name: str) -> None:
+        """Record a request that failed for another reason than a timeout."""
+        self.endpoint(name).errors += 1
+
+    def record_queued(self, depth: int) -> None:
+        """Record a request queued behind the rate limiter."""
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record_queue_wait(self, priority: int, seconds: float) -> None:
+        """Record the time a request waited before it was sent."""
+        if (histogram := self.queue_wait.get(priority)) is None:
+            histogram = self.queue_wait[priority] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def record_cycle(self, seconds: float, interval: float) -> None:
+        """Record the duration of a poll cycle, an overrun if it exceeded the interval."""
+        self.cycle.observe(seconds)
+        self.last_cycle = seconds
+        if seconds > interval:
+            self.cycle_overruns += 1
+
+    def as_dict(self) -> dict:
+        """Return all metrics as a JSON serializable dict."""
+        return {
+            "endpoints": {
+                name: metrics.as_dict() for name, metrics in sorted(self.endpoints.items())
+            },
+            "cycle": self.cycle.as_dict(),
+            "cycle_overruns": self.cycle_overruns,
+            "abandoned": dict(sorted(self.abandoned.items())),
+            "queue_wait": {
+                str(priority): histogram.as_dict()
+                for priority, histogram in sorted(self.queue_wait.items())
+            },
+            "max_queue_depth": self.max_queue_depth,
+            "last_cycle": self.last_cycle,
+        }
@@ -0,0 +1,191 @@
+"""Parsed state models for eversolo."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from .const import LOGGER
+
+if TYPE_CHECKING:
+    from .api import EversoloApiClient
+
+
+class EversoloOptionIndex:
+    """Ordered options with lookups by name and tag, built once per change."""
+
+    __slots__ = ("by_name", "by_tag", "names", "options")
+
+    def __init__(self, entries: Iterable[tuple[str, str]]) -> None:
+        """Index (name, tag) pairs in device order."""
+        entries = list(entries)
+        self.names: tuple[str, ...] = tuple(name for name, _ in entries)
+        # Options as the list Home Assistant expects, shared between reads
+        self.options: list[str] = list(self.names)
+        self.by_name: dict[str, tuple[int, str]] = {}
+        self.by_tag: dict[str, int] = {}
+        for index, (name, tag) in enumerate(entries):
+            self.by_name.setdefault(name, (index, tag))
+            self.by_tag.setdefault(tag, index)
+
+    def __len__(self) -> int:
+        """Return the number of options."""
+        return len(self.names)
+
+    def name_at(self, index: int) -> str | None:
+        """Return the name at index, None if out of range."""
+        if index < 0 or index >= len(self.names):
+            return None
+        return self.names[index]
+
+
+class EversoloPlaybackState:
+    """Playback state parsed once per poll from getState and the I/O list.
+
+    Every field is precomputed, so entity properties are attribute reads.
+    """
+
+    __slots__ = (
+        "album",
+        "artist",
+        "duration",
+        "image_key",
+        "image_url",
+        "is_volume_muted",
+        "max_volume",
+        "play_state",
+        "position",
+        "source",
+        "source_list",
+        "title",
+        "volume_level",
+    )
+
+    def __init__(self) -> None:
+        """Initialize an empty playback state."""
+        self.play_state: int | None = None
+        self.volume_level: float | None = None
+        self.max_volume: int | None = None
+        self.is_volume_muted: bool | None = None
+        self.source: str | None = None
+        self.source_list: list[str] | None = None
+        self.title: str | None = None
+        self.artist: str | None = None
+        self.album: str | None = None
+        self.image_key: str | None = None
+        self.image_url: str | None = None
+        self.duration: float | None = None
+        self.position: float | None = None
+
+    @classmethod
+    def from_data(cls, data: dict, client: EversoloApiClient) -> EversoloPlaybackState:
+        """Parse the playback state from coordinator data."""
+        playback = cls()
+        playback._parse_sources(data.get("input_output_state"))
+
+        music_control_state = data.get("music_control_state")
+        if music_control_state is not None:
+            playback._parse_music_control_state(music_control_state, client)
+
+        return playback
+
+    def _parse_sources(self, input_output_state: dict | None) -> None:
+        """Parse the current source and the source list."""
+        if input_output_state is None:
+            return
+
+        sources = input_output_state.get("transformed_sources", None)
+        if sources is None:
+            return
+
+        self.source_list = sources.options
+
+        input_index = input_output_state.get("inputIndex", -1)
+        self.source = sources.name_at(input_index)
+        if self.source is None:
+            LOGGER.debug("Input index %s is out of range", input_index)
+
+    def _parse_music_control_state(
+        self, music_control_state: dict, client: EversoloApiClient
+    ) -> None:
+        """Parse playback, volume and metadata from getState."""
+        self.play_state = int(music_control_state.get("state", -1))
+
+        volume_data = music_control_state.get("volumeData", {})
+        self.is_volume_muted = volume_data.get("isMute", None)
+        current_volume = volume_data.get("currenttVolume", None)
+        max_volume = volume_data.get("maxVolume", None)
+        if max_volume is not None:
+            self.max_volume = int(max_volume)
+        if current_volume is None or max_volume is None:
+            LOGGER.debug(
+                "Current volume or max volume invalid in music control state: %s",
+                music_control_state,
+            )
+        else:
+            self.volume_level = float(current_volume) / float(max_volume)
+
+        duration = music_control_state.get("duration", None)
+        if duration:
+            self.duration = duration / 1000
+
+        position = music_control_state.get("position", None)
+        if position:
+            self.position = position / 1000
+
+        play_type = music_control_state.get("playType", None)
+
+        # Bluetooth or Spotify Connect
+        if play_type == 4 or play_type == 6:
+            audio_info = music_control_state.get("everSoloPlayInfo", {}).get(
+                "everSoloPlayAudioInfo", {}
+            )
+            self.title = audio_info.get("songName", None)
+            self.artist = audio_info.get("artistName", None)
+            self.album = audio_info.get("albumName", None)
+
+        # Internal Player
+        if play_type == 5:
+            playing_music = music_control_state.get("playingMusic", {})
+            self.title = playing_music.get("title", None)
+            self.artist = playing_music.get("artist", None)
+            self.album = playing_music.get("album", None)
+
+        self._parse_image(music_control_state, play_type, client)
+
+    def _parse_image(
+        self, music_control_state: dict, play_type, client: EversoloApiClient
+    ) -> None:
+        """Parse the cache key and url of the current artwork."""
+        # Bluetooth or Spotify Connect
+        if play_type == 6:
+            album_url = music_control_state.get("everSoloPlayInfo", {}).get(
+                "icon", None
+            )
+
+            if album_url is None or album_url == "":
+                return
+
+            if not album_url.startswith("http"):
+                self.image_key = f"path:{album_url}"
+                self.image_url = client.create_image_url_by_path(album_url)
+                return
+
+            self.image_key = f"url:{album_url}"
+            self.image_url = album_url
+            return
+
+        # Internal Player
+        if play_type == 5:
+            album_art = music_control_state.get(
+                "playingMusic", {}).get("albumArt", None)
+
+            if album_art:
+                self.image_key = f"url:{album_art}"
+                self.image_url = album_art
+                return
+
+            song_id = music_control_state.get(
+                "playingMusic", {}).get("id", None)
+            if song_id is not None:
+                self.image_key = f"song:{song_id}"
+                self.image_url = client.create_image_url_by_song_id(song_id)
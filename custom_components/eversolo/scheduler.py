@@ -0,0 +1,228 @@
+"""Poll scheduling helpers for eversolo."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+import random
+import time
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_MAX,
+    BREAKER_RESET_MIN,
+    GLOBAL_MAX_IN_FLIGHT_REQUESTS,
+    OFFLINE_BACKOFF_FACTOR,
+    OFFLINE_BACKOFF_JITTER,
+    OFFLINE_BACKOFF_MAX,
+    OFFLINE_BACKOFF_MIN,
+    POLL_INTERVAL_IDLE,
+    POLL_INTERVAL_PAUSED,
+    POLL_INTERVAL_PLAYING,
+)
+
+# Poll timers drift by a few milliseconds, so an endpoint that is due just
+# after the current cycle starts is fetched now instead of one cycle later.
+_DUE_TOLERANCE = 0.25
+
+
+class EndpointScheduler:
+    """Decide which endpoints are due, based on a poll interval per endpoint."""
+
+    def __init__(
+        self,
+        intervals: dict[str, float],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._intervals = intervals
+        self._clock = clock
+        self._next_due: dict[str, float] = {}
+
+    @property
+    def intervals(self) -> dict[str, float]:
+        """Return the poll interval per endpoint."""
+        return self._intervals
+
+    def set_intervals(self, intervals: dict[str, float]) -> None:
+        """Replace the polled endpoints, keeping the schedule of remaining ones."""
+        self._intervals = intervals
+        for endpoint in set(self._next_due) - set(intervals):
+            del self._next_due[endpoint]
+
+    def due(self) -> list[str]:
+        """Return the endpoints that should be fetched in this cycle."""
+        now = self._clock() + _DUE_TOLERANCE
+        return [
+            endpoint
+            for endpoint in self._intervals
+            if self._next_due.get(endpoint, 0) <= now
+        ]
+
+    def mark_fetched(self, endpoints: Iterable[str]) -> None:
+        """Schedule the next fetch of successfully fetched endpoints."""
+        now = self._clock()
+        for endpoint in endpoints:
+            if endpoint in self._intervals:
+                self._next_due[endpoint] = now + self._intervals[endpoint]
+
+    def invalidate(self, endpoints: Iterable[str] | None = None) -> None:
+        """Make endpoints due immediately, or all of them if omitted."""
+        if endpoints is None:
+            self._next_due.clear()
+            return
+
+        for endpoint in endpoints:
+            self._next_due.pop(endpoint, None)
+
+
+class CircuitBreaker:
+    """Stop polling endpoints that keep failing, and retry them now and then.
+
+    An endpoint's circuit is closed while it works and opens after
+    BREAKER_FAILURE_THRESHOLD consecutive failures. Once its reset time
+    has passed it is half-open: a single fetch is let through, which
+    closes the circuit on success and reopens it for twice as long on
+    failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize the breaker with all circuits closed."""
+        self._clock = clock
+        self._failures: dict[str, int] = {}
+        self._reset_after: dict[str, float] = {}
+        self._retry_at: dict[str, float] = {}
+        self._half_open: set[str] = set()
+
+    def state(self, endpoint: str) -> str:
+        """Return the state of an endpoint's circuit."""
+        if endpoint in self._half_open:
+            return self.HALF_OPEN
+        if endpoint in self._retry_at:
+            return self.OPEN
+        return self.CLOSED
+
+    def allow(self, endpoints: Iterable[str]) -> list[str]:
+        """Return the endpoints that may be fetched now."""
+        now = self._clock()
+        allowed = []
+        for endpoint in endpoints:
+            if (retry_at := self._retry_at.get(endpoint)) is not None:
+                if retry_at > now or endpoint in self._half_open:
+                    continue
+                self._half_open.add(endpoint)
+            allowed.append(endpoint)
+        return allowed
+
+    def record(self, requested: Iterable[str], succeeded: Iterable[str]) -> None:
+        """Record which of the fetched endpoints succeeded."""
+        succeeded = set(succeeded)
+        for endpoint in requested:
+            if endpoint in succeeded:
+                self._failures.pop(endpoint, None)
+                self._reset_after.pop(endpoint, None)
+                self._retry_at.pop(endpoint, None)
+                self._half_open.discard(endpoint)
+                continue
+
+            failures = self._failures[endpoint] = self._failures.get(endpoint, 0) + 1
+            if endpoint in self._half_open:
+                self._half_open.discard(endpoint)
+                reset_after = min(self._reset_after[endpoint] * 2, BREAKER_RESET_MAX)
+            elif failures >= BREAKER_FAILURE_THRESHOLD and endpoint not in self._retry_at:
+                reset_after = BREAKER_RESET_MIN
+            else:
+                continue
+            self._reset_after[endpoint] = reset_after
+            self._retry_at[endpoint] = self._clock() + reset_after
+
+    def as_dict(self) -> dict[str, str]:
+        """Return the state of every circuit that is not closed."""
+        return {
+            endpoint: self.state(endpoint)
+            for endpoint in sorted(self._retry_at)
+        }
+
+
+class AdaptivePollInterval:
+    """Derive the poll interval from the playback state and reachability."""
+
+    def __init__(self, rand: Callable[[], float] = random.random) -> None:
+        """Initialize the interval engine."""
+        self._rand = rand
+        self._failures = 0
+        self.interval: float = POLL_INTERVAL_PLAYING
+
+    def on_command(self) -> float:
+        """Poll fast after a user command."""
+        self._failures = 0
+        self.interval = POLL_INTERVAL_PLAYING
+        return self.interval
+
+    def on_success(self, playback_state: int) -> float:
+        """Pick the interval after a successful poll."""
+        if self._failures:
+            # The device just came back, poll fast until its state is known
+            self._failures = 0
+            self.interval = POLL_INTERVAL_PLAYING
+        elif playback_state == 3:
+            self.interval = POLL_INTERVAL_PLAYING
+        elif playback_state == 4:
+            self.interval = POLL_INTERVAL_PAUSED
+        else:
+            self.interval = POLL_INTERVAL_IDLE
+        return self.interval
+
+    def on_failure(self) -> float:
+        """Back off exponentially, with jitter, while the device is offline."""
+        backoff = min(
+            OFFLINE_BACKOFF_MIN * OFFLINE_BACKOFF_FACTOR**self._failures,
+            OFFLINE_BACKOFF_MAX,
+        )
+        self._failures += 1
+        jitter = backoff * OFFLINE_BACKOFF_JITTER * (2 * self._rand() - 1)
+        self.interval = backoff + jitter
+        return self.interval
+
+
+class EversoloPollScheduler:
+    """Coordinate polling across all Eversolo devices.
+
+    Each device gets a slot that staggers its polls within the poll
+    interval, so many devices do not fire at the same moment, and all
+    clients share a cap on the requests in flight.
+    """
+
+    def __init__(self, max_in_flight: int = GLOBAL_MAX_IN_FLIGHT_REQUESTS) -> None:
+        """Initialize the scheduler."""
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self._slots: dict[str, int] = {}
+
+    def acquire_offset(self, device: str) -> float:
+        """Return the poll offset in seconds past the whole second for a device.
+
+        Slots follow the van der Corput sequence (0, 1/2, 1/4, 3/4, ...), so
+        the offsets stay evenly spread as devices are added and removed.
+        """
+        if device not in self._slots:
+            used = set(self._slots.values())
+            self._slots[device] = next(
+                slot for slot in range(len(used) + 1) if slot not in used)
+        return 0.05 + 0.9 * _van_der_corput(self._slots[device])
+
+    def release_offset(self, device: str) -> None:
+        """Free the slot of a device."""
+        self._slots.pop(device, None)
+
+
+def _van_der_corput(index: int) -> float:
+    """Return the index-th element of the base-2 van der Corput sequence."""
+    result, denominator = 0.0, 1
+    while index:
+        denominator *= 2
+        index, remainder = divmod(index, 2)
+        result += remainder / denominator
+    return result
@@ -6,10 +6,12 @@ from dataclasses import dataclass
 from typing import Any, Generic, TypeVar
 
 from homeassistant.components.select import SelectEntity, SelectEntityDescription
+from homeassistant.config_entries import ConfigEntry
 
 from .const import DOMAIN, LOGGER
 from .coordinator import EversoloDataUpdateCoordinator
 from .entity import EversoloEntity
+from .models import EversoloOptionIndex
 
 _EversoloDataUpdateCoordinatorT = TypeVar(
     "_EversoloDataUpdateCoordinatorT", bound=EversoloDataUpdateCoordinator
@@ -20,9 +22,11 @@ _EversoloDataUpdateCoordinatorT = TypeVar(
 class EversoloSelectDescriptionMixin(Generic[_EversoloDataUpdateCoordinatorT]):
     """Mixin to describe a Select entity."""
 
+    data_key: str
+    selected_index_key: str
     get_selected_option: Callable[[_EversoloDataUpdateCoordinatorT], int]
     get_available_options: Callable[[
-        _EversoloDataUpdateCoordinatorT], list[dict]]
+        _EversoloDataUpdateCoordinatorT], EversoloOptionIndex | None]
     select_option: Callable[
         [_EversoloDataUpdateCoordinatorT, int, str], Coroutine[Any, Any, None]
     ]
@@ -41,12 +45,14 @@ ENTITY_DESCRIPTIONS = [
         key="vu_style",
         name="Eversolo VU Style",
         icon="mdi:gauge-low",
+        data_key="vu_mode_state",
+        selected_index_key="currentIndex",
         get_selected_option=lambda coordinator: coordinator.data.get(
             "vu_mode_state", {}
         ).get("currentIndex", -1),
         get_available_options=lambda coordinator: coordinator.data.get(
             "vu_mode_state", {}
-        ).get("data", None),
+        ).get("transformed_options", None),
         select_option=lambda coordinator, index, tag: coordinator.client.async_select_vu_mode_option(
             index, tag
         ),
@@ -55,12 +61,14 @@ ENTITY_DESCRIPTIONS = [
         key="spectrum_style",
         name="Eversolo Spectrum Style",
         icon="mdi:chart-histogram",
+        data_key="spectrum_mode_state",
+        selected_index_key="currentIndex",
         get_selected_option=lambda coordinator: coordinator.data.get(
             "spectrum_mode_state", {}
         ).get("currentIndex", -1),
         get_available_options=lambda coordinator: coordinator.data.get(
             "spectrum_mode_state", {}
-        ).get("data", None),
+        ).get("transformed_options", None),
         select_option=lambda coordinator, index, tag: coordinator.client.async_select_spectrum_mode_option(
             index, tag
         ),
@@ -69,6 +77,8 @@ ENTITY_DESCRIPTIONS = [
         key="output_mode",
         name="Eversolo Output Mode",
         icon="mdi:export",
+        data_key="input_output_state",
+        selected_index_key="outputIndex",
         get_selected_option=lambda coordinator: coordinator.data.get(
             "input_output_state", {}
         ).get("outputIndex", -1),
@@ -90,8 +100,10 @@ async def async_setup_entry(hass, entry, async_add_devices):
         EversoloSelect(
             coordinator=coordinator,
             entity_description=entity_description,
+            config_entry=entry,
         )
         for entity_description in ENTITY_DESCRIPTIONS
+        if coordinator.supports(entity_description.data_key)
     )
 
 
@@ -102,13 +114,15 @@ class EversoloSelect(EversoloEntity, SelectEntity):
         self,
         coordinator: EversoloDataUpdateCoordinator,
         entity_description: SelectEntityDescription,
+        config_entry: ConfigEntry | None = None,
     ) -> None:
         """Initialize the Select class."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, config_entry)
         self.entity_description = entity_description
         self._attr_unique_id = (
-            f"{coordinator.config_entry.entry_id}_{entity_description.key}"
+            f"{self._config_entry.entry_id}_{entity_description.key}"
         )
+        self._data_keys = (entity_description.data_key,)
 
     @property
     def options(self) -> list[str]:
@@ -120,19 +134,21 @@ class EversoloSelect(EversoloEntity, SelectEntity):
             LOGGER.debug("No options found")
             return []
 
-        return [options[i].get("title", "") for i in range(len(options))]
+        return options.options
 
     @property
     def current_option(self) -> str:
         """Return current state."""
+        options = self.entity_description.get_available_options(
+            self.coordinator)
         current_index = self.entity_description.get_selected_option(
             self.coordinator)
 
-        if current_index < 0 or current_index >= len(self.options):
+        if options is None or (option := options.name_at(current_index)) is None:
             LOGGER.debug("Current index %s is out of range", current_index)
             return None
 
-        return list(self.options)[current_index]
+        return option
 
     async def async_select_option(self, option: str) -> None:
         """Change to selected option."""
@@ -144,15 +160,15 @@ class EversoloSelect(EversoloEntity, SelectEntity):
             LOGGER.error("No options found")
             return
 
-        index, tag = None, None
-        for i, value in enumerate(options):
-            if option == value.get("title", None):
-                index, tag = i, value.get("tag", "")
-                break
-
-        if index is None or tag is None:
+        if (entry := options.by_name.get(option)) is None:
             LOGGER.debug("Option %s not found", option)
             return
 
-        await self.entity_description.select_option(self.coordinator, index, tag)
-        self._attr_current_option = option
+        index, tag = entry
+        await self.coordinator.async_optimistic_command(
+            self.entity_description.select_option(self.coordinator, index, tag),
+            self.entity_description.data_key,
+            (self.entity_description.selected_index_key,),
+            index,
+        )
+        await self.coordinator.async_refresh_endpoints(self._data_keys)
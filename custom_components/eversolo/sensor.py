@@ -0,0 +1,241 @@
+"""Sensor platform for eversolo."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.util import dt as dt_util
+
+from .api import PRIORITY_COMMAND, PRIORITY_POLL
+from .const import DOMAIN
+from .coordinator import EversoloDataUpdateCoordinator
+from .entity import EversoloEntity
+from .metrics import EndpointMetrics, EversoloMetrics
+
+# Metrics change on every request, so the sensors write their state on a
+# timer of their own instead of on every poll
+SCAN_INTERVAL = timedelta(seconds=30)
+
+# Endpoints polled by the coordinator, by data key, as name in the metrics
+# and entity name
+POLLED_ENDPOINTS = {
+    "music_control_state": ("getState", "Playback State"),
+    "input_output_state": ("getInputAndOutputList", "Inputs and Outputs"),
+    "is_display_on": ("getPowerOption", "Power Options"),
+    "display_brightness": ("getScreenBrightness", "Display Brightness"),
+    "knob_brightness": ("getKnobBrightness", "Knob Brightness"),
+    "vu_mode_state": ("getVUModeList", "VU Modes"),
+    "spectrum_mode_state": ("getSpPlayModeList", "Spectrum Modes"),
+}
+
+
+@dataclass
+class EversoloSensorDescriptionMixin:
+    """Mixin to describe a Sensor entity."""
+
+    value_fn: Callable[[EversoloMetrics], Any]
+
+
+@dataclass
+class EversoloSensorDescription(
+    SensorEntityDescription,
+    EversoloSensorDescriptionMixin,
+):
+    """Class to describe a Sensor entity."""
+
+    # Data key of the endpoint the sensor reports on, if any
+    data_key: str | None = None
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    """Convert seconds to rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _endpoint_value(
+    endpoint: str, value_fn: Callable[[EndpointMetrics], Any]
+) -> Callable[[EversoloMetrics], Any]:
+    """Return a function reading a value of an endpoint's metrics."""
+
+    def value(metrics: EversoloMetrics) -> Any:
+        if (endpoint_metrics := metrics.endpoints.get(endpoint)) is None:
+            return None
+        return value_fn(endpoint_metrics)
+
+    return value
+
+
+def _queue_wait_p95(priority: int) -> Callable[[EversoloMetrics], Any]:
+    """Return a function reading the p95 queue wait of a request priority."""
+
+    def value(metrics: EversoloMetrics) -> Any:
+        if (histogram := metrics.queue_wait.get(priority)) is None:
+            return None
+        return _milliseconds(histogram.percentile(0.95))
+
+    return value
+
+
+def _endpoint_descriptions(
+    data_key: str, endpoint: str, name: str
+) -> list[EversoloSensorDescription]:
+    """Return the sensor descriptions of one endpoint."""
+    return [
+        EversoloSensorDescription(
+            key=f"{endpoint}_latency_p95",
+            data_key=data_key,
+            name=f"Eversolo {name} Latency (p95)",
+            icon="mdi:timer-outline",
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            state_class=SensorStateClass.MEASUREMENT,
+            value_fn=_endpoint_value(
+                endpoint, lambda metrics: _milliseconds(metrics.latency.percentile(0.95))),
+        ),
+        EversoloSensorDescription(
+            key=f"{endpoint}_timeouts",
+            data_key=data_key,
+            name=f"Eversolo {name} Timeouts",
+            icon="mdi:timer-alert-outline",
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            value_fn=_endpoint_value(endpoint, lambda metrics: metrics.timeouts),
+        ),
+        EversoloSensorDescription(
+            key=f"{endpoint}_errors",
+            data_key=data_key,
+            name=f"Eversolo {name} Errors",
+            icon="mdi:alert-circle-outline",
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            value_fn=_endpoint_value(endpoint, lambda metrics: metrics.errors),
+        ),
+        EversoloSensorDescription(
+            key=f"{endpoint}_last_success",
+            data_key=data_key,
+            name=f"Eversolo {name} Last Success",
+            device_class=SensorDeviceClass.TIMESTAMP,
+            value_fn=_endpoint_value(
+                endpoint,
+                lambda metrics: None
+                if metrics.last_success is None
+                else dt_util.utc_from_timestamp(metrics.last_success),
+            ),
+        ),
+    ]
+
+
+ENTITY_DESCRIPTIONS = [
+    EversoloSensorDescription(
+        key="poll_cycle_duration",
+        name="Eversolo Poll Cycle Duration",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _milliseconds(metrics.last_cycle),
+    ),
+    EversoloSensorDescription(
+        key="poll_cycle_duration_p95",
+        name="Eversolo Poll Cycle Duration (p95)",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _milliseconds(metrics.cycle.percentile(0.95)),
+    ),
+    EversoloSensorDescription(
+        key="poll_cycle_overruns",
+        name="Eversolo Poll Cycle Overruns",
+        icon="mdi:timer-alert-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.cycle_overruns,
+    ),
+    EversoloSensorDescription(
+        key="request_queue_depth_max",
+        name="Eversolo Request Queue Depth (max)",
+        icon="mdi:tray-full",
+        value_fn=lambda metrics: metrics.max_queue_depth,
+    ),
+    EversoloSensorDescription(
+        key="command_queue_wait_p95",
+        name="Eversolo Command Queue Wait (p95)",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_queue_wait_p95(PRIORITY_COMMAND),
+    ),
+    EversoloSensorDescription(
+        key="poll_queue_wait_p95",
+        name="Eversolo Poll Queue Wait (p95)",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_queue_wait_p95(PRIORITY_POLL),
+    ),
+    *(
+        description
+        for data_key, (endpoint, name) in POLLED_ENDPOINTS.items()
+        for description in _endpoint_descriptions(data_key, endpoint, name)
+    ),
+]
+
+
+async def async_setup_entry(hass, entry, async_add_devices):
+    """Set up the Sensor platform."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_devices(
+        EversoloSensor(
+            coordinator=coordinator,
+            entity_description=entity_description,
+            config_entry=entry,
+        )
+        for entity_description in ENTITY_DESCRIPTIONS
+        if entity_description.data_key is None
+        or coordinator.supports(entity_description.data_key)
+    )
+
+
+class EversoloSensor(EversoloEntity, SensorEntity):
+    """Diagnostic sensor exposing request and poll cycle metrics."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _data_keys = ()
+
+    def __init__(
+        self,
+        coordinator: EversoloDataUpdateCoordinator,
+        entity_description: EversoloSensorDescription,
+        config_entry: ConfigEntry | None = None,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry)
+        self.entity_description = entity_description
+        self._attr_unique_id = (
+            f"{self._config_entry.entry_id}_{entity_description.key}"
+        )
+
+    @property
+    def should_poll(self) -> bool:
+        """Return True, the state is written every SCAN_INTERVAL."""
+        return True
+
+    @property
+    def available(self) -> bool:
+        """Return True, metrics are available while the device is offline."""
+        return True
+
+    @property
+    def native_value(self):
+        """Return the value of the metric."""
+        return self.entity_description.value_fn(self.coordinator.client.metrics)
+
+    async def async_update(self) -> None:
+        """Do nothing, the state is read from the metrics when it is written."""
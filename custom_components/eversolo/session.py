@@ -0,0 +1,68 @@
+"""HTTP sessions for eversolo devices."""
+from __future__ import annotations
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import (
+    DATA_SESSIONS,
+    DEVICE_CONNECTION_LIMIT,
+    DEVICE_DNS_CACHE_TTL,
+    DEVICE_KEEPALIVE_TIMEOUT,
+)
+
+
+def create_device_session() -> aiohttp.ClientSession:
+    """Create a session tuned for polling a single device on the LAN.
+
+    Connections are kept alive across polls, even at the slowest poll
+    interval, and limited to what the device's HTTP server handles well.
+    """
+    connector = aiohttp.TCPConnector(
+        limit_per_host=DEVICE_CONNECTION_LIMIT,
+        keepalive_timeout=DEVICE_KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=DEVICE_DNS_CACHE_TTL,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def async_acquire_session(hass: HomeAssistant, host: str, port: int) -> aiohttp.ClientSession:
+    """Return the session for a device, creating it on first use."""
+    if (sessions := hass.data.get(DATA_SESSIONS)) is None:
+        sessions = hass.data[DATA_SESSIONS] = {}
+
+        @callback
+        def _async_close_sessions(_: Event) -> None:
+            """Close all sessions when Home Assistant shuts down."""
+            for session, _ in sessions.values():
+                hass.async_create_task(session.close())
+            sessions.clear()
+
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, _async_close_sessions)
+
+    key = f"{host}:{port}"
+    session, users = sessions.get(key, (None, 0))
+    if session is None or session.closed:
+        session, users = create_device_session(), 0
+    sessions[key] = (session, users + 1)
+    return session
+
+
+async def async_release_session(hass: HomeAssistant, host: str, port: int) -> None:
+    """Release a device session, closing it when its last user is gone."""
+    sessions = hass.data.get(DATA_SESSIONS, {})
+    key = f"{host}:{port}"
+    if key not in sessions:
+        return
+
+    session, users = sessions[key]
+    if users > 1:
+        sessions[key] = (session, users - 1)
+        return
+
+    del sessions[key]
+    await session.close()
@@ -0,0 +1,407 @@
+"""Benchmarks for the poll cycle and entity property evaluation.
+
+Runs against the local emulator (scripts/emulator.py) and reports:
+
+- poll: wall time, requests and new connections per async_get_data
+  cycle, with the per-device session and with a default aiohttp session
+- concurrent refresh: requests per endpoint reaching the device when 20
+  refreshes run at once, which share requests and should be 1
+- decode: CPU time per cycle to decode every JSON response, with the
+  client's decoder and with the standard library
+- transform: CPU time per cycle in transform_sources, transform_outputs
+  and extract_is_screen_on
+- properties: CPU time to evaluate every property of the media player,
+  light and select entities, and the media player's properties compared
+  to walking the raw responses on every access as before the parsed
+  playback model
+- state writes: entity state writes per minute when a recorded minute of
+  tiered polls, half playing and half paused, is replayed through the
+  entities, with every update written to every entity as before change
+  filtering and with the filtering of EversoloEntity
+
+Results are written as JSON. Passing a baseline compares every metric to
+it and exits non-zero if one regressed by more than the allowed ratio:
+
+    python scripts/benchmark.py --output baseline.json
+    python scripts/benchmark.py --baseline baseline.json --max-regression 0.2
+
+Requires the development requirements (requirements.txt).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from custom_components.eversolo.api import EversoloApiClient  # noqa: E402
+from custom_components.eversolo.button import (  # noqa: E402
+    ENTITY_DESCRIPTIONS as BUTTON_DESCRIPTIONS,
+    EversoloButton,
+)
+from custom_components.eversolo.const import POLL_TIERS  # noqa: E402
+from custom_components.eversolo.light import (  # noqa: E402
+    ENTITY_DESCRIPTIONS as LIGHT_DESCRIPTIONS,
+    EversoloLight,
+)
+from custom_components.eversolo.media_player import EversoloMediaPlayer  # noqa: E402
+from custom_components.eversolo.models import EversoloPlaybackState  # noqa: E402
+from custom_components.eversolo.scheduler import EndpointScheduler  # noqa: E402
+from custom_components.eversolo.select import (  # noqa: E402
+    ENTITY_DESCRIPTIONS as SELECT_DESCRIPTIONS,
+    EversoloSelect,
+)
+from custom_components.eversolo.session import create_device_session  # noqa: E402
+from dict_walk_media_player import (  # noqa: E402
+    DictWalkingMediaPlayer,
+    dict_walk_data,
+)
+from emulator import EversoloEmulator, Faults  # noqa: E402
+
+MEDIA_PLAYER_PROPERTIES = (
+    "state",
+    "volume_level",
+    "is_volume_muted",
+    "source",
+    "source_list",
+    "media_title",
+    "media_artist",
+    "media_album_name",
+    "media_image_url",
+    "media_image_hash",
+    "media_duration",
+    "media_position",
+)
+# Properties the media player had before the parsed playback model
+DICT_WALK_PROPERTIES = tuple(
+    prop for prop in MEDIA_PLAYER_PROPERTIES if prop != "media_image_hash")
+LIGHT_PROPERTIES = ("is_on", "brightness")
+SELECT_PROPERTIES = ("options", "current_option")
+CONCURRENT_REFRESHES = 20
+# One minute of polls at the fast tier interval
+TRACE_CYCLES = 60
+# Back-to-back cycles would otherwise wait for the device's rate limiter
+UNLIMITED_RATE = 1e6
+
+
+def _per_call(seconds: float, iterations: int) -> float:
+    """Return microseconds per call."""
+    return seconds / iterations * 1e6
+
+
+async def bench_poll(client: EversoloApiClient, emulator: EversoloEmulator, cycles: int) -> dict:
+    """Measure wall time and requests of full poll cycles."""
+    durations = []
+    emulator.requests.clear()
+    connections = emulator.connections
+    for _ in range(cycles):
+        start = time.perf_counter()
+        await client.async_get_data()
+        durations.append(time.perf_counter() - start)
+
+    return {
+        "poll_cycle_ms_median": statistics.median(durations) * 1000,
+        "poll_cycle_ms_max": max(durations) * 1000,
+        "poll_requests_per_cycle": sum(emulator.requests.values()) / cycles,
+        "poll_connections_per_cycle": (emulator.connections - connections) / cycles,
+    }
+
+
+async def bench_concurrent_refresh(client: EversoloApiClient, emulator: EversoloEmulator) -> dict:
+    """Count requests per endpoint when many refreshes run at once."""
+    emulator.requests.clear()
+    await asyncio.gather(*(client.async_get_data() for _ in range(CONCURRENT_REFRESHES)))
+    return {
+        "concurrent_refresh_requests_per_endpoint":
+            max(emulator.requests.values()),
+    }
+
+
+async def bench_poll_default_session(cycles: int) -> dict:
+    """Measure new connections per cycle with a default aiohttp session."""
+    emulator = EversoloEmulator(seed=0)
+    port = await emulator.async_start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = EversoloApiClient(
+                "127.0.0.1", port, session, response_cache_ttl=0,
+                request_rate=UNLIMITED_RATE)
+            results = await bench_poll(client, emulator, cycles)
+    finally:
+        await emulator.async_stop()
+    return {"default_session_connections_per_cycle": results["poll_connections_per_cycle"]}
+
+
+async def bench_decode(client: EversoloApiClient, iterations: int) -> dict:
+    """Measure CPU time of decoding the JSON responses of a poll cycle."""
+    bodies = []
+    decode = client._decode_json
+
+    def record(body: bytes):
+        bodies.append(body)
+        return decode(body)
+
+    client._decode_json = record
+    try:
+        await client.async_get_data()
+    finally:
+        del client._decode_json
+
+    start = time.process_time()
+    for _ in range(iterations):
+        for body in bodies:
+            client._decode_json(body)
+    client_seconds = time.process_time() - start
+
+    # What response.json() does: decode to text, then parse
+    start = time.process_time()
+    for _ in range(iterations):
+        for body in bodies:
+            json.loads(body.decode("utf-8"))
+    stdlib_seconds = time.process_time() - start
+
+    return {
+        "decode_bytes_per_cycle": sum(len(body) for body in bodies),
+        "decode_us_per_cycle": _per_call(client_seconds, iterations),
+        "decode_stdlib_us_per_cycle": _per_call(stdlib_seconds, iterations),
+    }
+
+
+async def bench_transform(client: EversoloApiClient, iterations: int) -> dict:
+    """Measure CPU time of the per-cycle response transforms."""
+    input_output_state = await client._api_wrapper(
+        method="get",
+        url=f"http://{client._host}:{client._port}/ZidooMusicControl/v2/getInputAndOutputList",
+    )
+    power_options = await client._api_wrapper(
+        method="get",
+        url=f"http://{client._host}:{client._port}/ZidooMusicControl/v2/getPowerOption",
+    )
+
+    start = time.process_time()
+    for _ in range(iterations):
+        # A fresh copy per cycle, as a poll returns a newly decoded response
+        state = {**input_output_state,
+                 "inputData": list(input_output_state["inputData"])}
+        client.transform_sources(state)
+        client.transform_outputs(state)
+        client.extract_is_screen_on(power_options)
+    return {"transform_us_per_cycle": _per_call(time.process_time() - start, iterations)}
+
+
+def _fake_coordinator(client: EversoloApiClient, data: dict) -> SimpleNamespace:
+    """Return a stand-in for the coordinator the entities read from."""
+    return SimpleNamespace(
+        client=client,
+        data=data,
+        playback=EversoloPlaybackState.from_data(data, client),
+        fetched_at={},
+        changed_keys=set(),
+        last_update_success=True,
+        config_entry=SimpleNamespace(entry_id="benchmark", data={}),
+    )
+
+
+def _entities(coordinator: SimpleNamespace) -> list:
+    """Return one entity per media player, light, select and button."""
+    return [
+        EversoloMediaPlayer(coordinator, coordinator.config_entry),
+        *(EversoloLight(coordinator, description)
+          for description in LIGHT_DESCRIPTIONS),
+        *(EversoloSelect(coordinator, description)
+          for description in SELECT_DESCRIPTIONS),
+        *(EversoloButton(coordinator, description)
+          for description in BUTTON_DESCRIPTIONS),
+    ]
+
+
+async def record_trace(client: EversoloApiClient, cycles: int) -> list[dict]:
+    """Record the responses of a minute of tiered polls.
+
+    The device plays for the first half and is paused for the second.
+    Cycles are a second apart on a simulated clock, so each one fetches
+    the endpoints its tiers make due.
+    """
+    now = 0.0
+    scheduler = EndpointScheduler(POLL_TIERS, clock=lambda: now)
+    trace = []
+    for cycle in range(cycles):
+        if cycle == cycles // 2:
+            await client.async_toggle_play_pause()
+        fetched = await client.async_get_data(scheduler.due())
+        scheduler.mark_fetched(fetched)
+        trace.append(fetched)
+        now += 1
+    return trace
+
+
+def replay_state_writes(client: EversoloApiClient, trace: list[dict], filtered: bool) -> int:
+    """Replay a trace through the entities and count their state writes.
+
+    Unfiltered, as before change filtering, every poll notifies every
+    entity and each one writes its state. Filtered, the coordinator only
+    notifies on changed data and entities skip keys they do not read.
+    """
+    coordinator = _fake_coordinator(client, trace[0])
+    entities = _entities(coordinator)
+    writes = 0
+
+    def count_write() -> None:
+        nonlocal writes
+        writes += 1
+
+    for entity in entities:
+        entity.async_write_ha_state = count_write
+        if not filtered:
+            entity._data_keys = None
+
+    for fetched in trace:
+        data = {**coordinator.data, **fetched}
+        coordinator.changed_keys = {
+            key for key, value in fetched.items()
+            if coordinator.data.get(key) != value
+        }
+        coordinator.data = data
+        coordinator.playback = EversoloPlaybackState.from_data(data, client)
+        if filtered and not coordinator.changed_keys:
+            # always_update=False: unchanged data notifies nobody
+            continue
+        for entity in entities:
+            entity._handle_coordinator_update()
+    return writes
+
+
+async def bench_state_writes(client: EversoloApiClient) -> dict:
+    """Count entity state writes per minute of a replayed poll trace."""
+    trace = await record_trace(client, TRACE_CYCLES)
+    minutes = TRACE_CYCLES / 60
+    return {
+        "state_writes_per_minute_unfiltered":
+            replay_state_writes(client, trace, filtered=False) / minutes,
+        "state_writes_per_minute":
+            replay_state_writes(client, trace, filtered=True) / minutes,
+    }
+
+
+def bench_properties(client: EversoloApiClient, data: dict, iterations: int) -> dict:
+    """Measure CPU time of evaluating every entity property."""
+    coordinator = _fake_coordinator(client, data)
+    entities = [
+        (EversoloMediaPlayer(coordinator, coordinator.config_entry),
+         MEDIA_PLAYER_PROPERTIES),
+        *((EversoloLight(coordinator, description), LIGHT_PROPERTIES)
+          for description in LIGHT_DESCRIPTIONS),
+        *((EversoloSelect(coordinator, description), SELECT_PROPERTIES)
+          for description in SELECT_DESCRIPTIONS),
+    ]
+
+    results = {}
+    for entity, properties in entities:
+        name = type(entity).__name__
+        if (description := getattr(entity, "entity_description", None)) is not None:
+            name = f"{name}.{description.key}"
+        start = time.process_time()
+        for _ in range(iterations):
+            for prop in properties:
+                getattr(entity, prop)
+        results[f"properties_us_{name}"] = _per_call(
+            time.process_time() - start, iterations)
+
+    for name, entity in (
+        ("model", entities[0][0]),
+        ("dict_walk", DictWalkingMediaPlayer(
+            SimpleNamespace(**{**vars(coordinator), "data": dict_walk_data(data)}))),
+    ):
+        start = time.process_time()
+        for _ in range(iterations):
+            for prop in DICT_WALK_PROPERTIES:
+                getattr(entity, prop)
+        results[f"media_player_properties_us_{name}"] = _per_call(
+            time.process_time() - start, iterations)
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Run all benchmarks against a fresh emulator."""
+    emulator = EversoloEmulator(
+        Faults(latency=args.latency, jitter=args.jitter), seed=0)
+    port = await emulator.async_start()
+    try:
+        async with create_device_session() as session:
+            # Back-to-back cycles would otherwise be answered from the
+            # response cache; concurrent reads are still shared
+            client = EversoloApiClient(
+                "127.0.0.1", port, session, response_cache_ttl=0,
+                request_rate=UNLIMITED_RATE)
+            results = await bench_poll(client, emulator, args.cycles)
+            results |= await bench_concurrent_refresh(client, emulator)
+            results |= await bench_decode(client, args.iterations)
+            results |= await bench_transform(client, args.iterations)
+            data = await client.async_get_data()
+            results |= bench_properties(client, data, args.iterations)
+            results |= await bench_state_writes(client)
+    finally:
+        await emulator.async_stop()
+    results |= await bench_poll_default_session(args.cycles)
+    return results
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Return the metrics that regressed beyond the allowed ratio."""
+    regressions = []
+    for key, value in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        ratio = value / previous - 1
+        if ratio > max_regression:
+            regressions.append(
+                f"{key}: {previous:.2f} -> {value:.2f} (+{ratio:.0%})")
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmarks and report the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=50,
+                        help="poll cycles to time")
+    parser.add_argument("--iterations", type=int, default=10000,
+                        help="iterations of the CPU benchmarks")
+    parser.add_argument("--latency", type=float, default=0.03,
+                        help="emulated device latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02,
+                        help="emulated device jitter in seconds")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed relative regression per metric")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)  # noqa: T201
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.max_regression)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)  # noqa: T201
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
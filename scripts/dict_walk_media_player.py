@@ -0,0 +1,278 @@
+"""Media player properties as computed before the parsed playback model.
+
+Every property walks the raw responses in coordinator.data, as the media
+player did before EversoloPlaybackState. Kept for scripts/benchmark.py,
+which compares the property cost of both.
+"""
+from __future__ import annotations
+
+import datetime as dt
+
+from homeassistant.components.media_player import MediaPlayerState
+
+
+def dict_walk_data(data: dict) -> dict:
+    """Return data with the sources as the tag to name dict used before."""
+    input_output_state = data.get("input_output_state")
+    if input_output_state is None:
+        return data
+
+    sources = input_output_state["transformed_sources"]
+    return {
+        **data,
+        "input_output_state": {
+            **input_output_state,
+            "transformed_sources": {
+                tag: sources.names[index] for tag, index in sources.by_tag.items()
+            },
+        },
+    }
+
+
+class DictWalkingMediaPlayer:
+    """Media player properties read from coordinator.data on every access."""
+
+    def __init__(self, coordinator) -> None:
+        """Initialize the properties."""
+        self.coordinator = coordinator
+        self._state = None
+        self._attr_media_position_updated_at = None
+
+    @property
+    def state(self):
+        """Return Media Player state."""
+        if not self.coordinator.last_update_success:
+            return MediaPlayerState.OFF
+
+        music_control_state = self.coordinator.data.get(
+            "music_control_state", None)
+
+        if music_control_state is None:
+            return MediaPlayerState.OFF
+
+        state = int(music_control_state.get("state", -1))
+
+        if state == 0:
+            self._state = MediaPlayerState.IDLE
+        elif state == 3:
+            self._state = MediaPlayerState.PLAYING
+            self._attr_media_position_updated_at = dt.datetime.now()
+        elif state == 4:
+            self._state = MediaPlayerState.PAUSED
+        else:
+            self._state = None
+
+        return self._state
+
+    @property
+    def volume_level(self):
+        """Volume level of the Media Player in range 0..1."""
+        music_control_state = self.coordinator.data.get(
+            "music_control_state", None)
+
+        if music_control_state is None:
+            return None
+
+        current_volume = music_control_state.get("volumeData", {}).get(
+            "currenttVolume", None
+        )
+        max_volume = music_control_state.get(
+            "volumeData", {}).get("maxVolume", None)
+
+        if current_volume is None or max_volume is None:
+            return None
+
+        return float(current_volume) / float(max_volume)
+
+    @property
+    def is_volume_muted(self):
+        """Return muted state."""
+        music_control_state = self.coordinator.data.get(
+            "music_control_state", None)
+
+        if music_control_state is None:
+            return None
+
+        return music_control_state.get("volumeData", {}).get("isMute", None)
+
+    @property
+    def source(self):
+        """Return the current input source."""
+        input_output_state = self.coordinator.data.get(
+            "input_output_state", None)
+
+        if input_output_state is None:
+            return None
+
+        sources = self.coordinator.data.get("input_output_state", {}).get(
+            "transformed_sources", None
+        )
+
+        if sources is None:
+            return None
+
+        input_index = input_output_state.get("inputIndex", -1)
+        if input_index < 0 or input_index >= len(sources):
+            return None
+
+        return list(sources.values())[input_index]
+
+    @property
+    def source_list(self):
+        """List of available input sources."""
+        sources = self.coordinator.data.get("input_output_state", {}).get(
+            "transformed_sources", None
+        )
+
+        if sources is None:
+            return None
+
+        return list(sources.values())
+
+    @property
+    def media_title(self):
+        """Title of current playing media."""
+        music_control_state = self.coordinator.data.get(
+            "music_control_state", None)
+
+        if music_control_state is None:
+            return None
+
+        play_type = music_control_state.get("playType", None)
+
+        # Bluetooth or Spotify Connect
+        if play_type == 4 or play_type == 6:
+            return (
+                music_control_state.get("everSoloPlayInfo", {})
+                .get("everSoloPlayAudioInfo", {})
+                .get("songName", None)
+            )
+
+        # Internal Player
+        if play_type == 5:
+            return music_control_state.get("playingMusic", {}).get("title", None)
+
+        return None
+
+    @property
+    def media_artist(self):
+        """Artist of current playing media."""
+        music_control_state = self.coordinator.data.get(
+            "music_control_state", None)
+
+        if music_control_state is None:
+            return None
+
+        play_type = music_control_state.get("playType", None)
+
+        # Bluetooth or Spotify Connect
+        if play_type == 4 or play_type == 6:
+            return (
+                music_control_state.get("everSoloPlayInfo", {})
+                .get("everSoloPlayAudioInfo", {})
+                .get("artistName", None)
+            )
+
+        # Internal Player
+        if play_type == 5:
+            return music_control_state.get("playingMusic", {}).get("artist", None)
+
+        return None
+
+    @property
+    def media_album_name(self):
+        """Album of current playing media."""
+        music_control_state = self.coordinator.data.get(
+            "music_control_state", None)
+
+        if music_control_state is None:
+            return None
+
+        play_type = music_control_state.get("playType", None)
+
+        # Bluetooth or Spotify Connect
+        if play_type == 4 or play_type == 6:
+            return (
+                music_control_state.get("everSoloPlayInfo", {})
+                .get("everSoloPlayAudioInfo", {})
+                .get("albumName", None)
+            )
+
+        # Internal Player
+        if play_type == 5:
+            return music_control_state.get("playingMusic", {}).get("album", None)
+
+        return None
+
+    @property
+    def media_image_url(self):
+        """Image url of current playing media."""
+        music_control_state = self.coordinator.data.get(
+            "music_control_state", None)
+
+        if music_control_state is None:
+            return None
+
+        play_type = music_control_state.get("playType", None)
+
+        # Bluetooth or Spotify Connect
+        if play_type == 6:
+            album_url = music_control_state.get("everSoloPlayInfo", {}).get(
+                "icon", None
+            )
+
+            if album_url is None or album_url == "":
+                return None
+
+            if not album_url.startswith("http"):
+                album_url = self.coordinator.client.create_image_url_by_path(
+                    album_url)
+
+            return album_url
+
+        # Internal Player
+        if play_type == 5:
+            album_art = music_control_state.get(
+                "playingMusic", {}).get("albumArt", None)
+
+            if album_art:
+                return album_art
+
+            song_id = music_control_state.get(
+                "playingMusic", {}).get("id", None)
+            if song_id is not None:
+                return self.coordinator.client.create_image_url_by_song_id(song_id)
+
+        return None
+
+    @property
+    def media_duration(self):
+        """Duration of current playing media in seconds."""
+        music_control_state = self.coordinator.data.get(
+            "music_control_state", None)
+
+        if music_control_state is None:
+            return None
+
+        duration = music_control_state.get("duration", None)
+
+        if duration is None or duration == 0:
+            return None
+
+        return duration / 1000
+
+    @property
+    def media_position(self):
+        """Position of current playing media in seconds."""
+        music_control_state = self.coordinator.data.get(
+            "music_control_state", None)
+
+        if music_control_state is None:
+            return None
+
+        position = music_control_state.get("position", None)
+
+        if position is None or position == 0:
+            return None
+
+        return position / 1000
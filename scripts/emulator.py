@@ -0,0 +1,446 @@
+"""Local stand-in for an Eversolo streamer, for tests and benchmarks.
+
+Serves every endpoint EversoloApiClient uses with stateful responses, so
+commands like setDevicesVolume show up in the next getState. Latency,
+jitter, dropped connections, 5xx responses and slow bodies can be injected
+globally or per endpoint. Endpoints a model lacks can be answered with 404.
+
+Run standalone with:
+
+    python scripts/emulator.py --port 9529 --latency 0.05 --jitter 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field, replace
+import json
+import random
+import time
+import weakref
+
+from aiohttp import web
+
+TRACKS = [
+    {"id": 101, "title": "So What", "artist": "Miles Davis",
+        "album": "Kind of Blue", "duration": 562000},
+    {"id": 102, "title": "Blue in Green", "artist": "Miles Davis",
+        "album": "Kind of Blue", "duration": 337000},
+    {"id": 201, "title": "Teen Town", "artist": "Weather Report",
+        "album": "Heavy Weather", "duration": 171000},
+]
+
+INPUTS = [
+    {"tag": "XMOS", "name": "Internal Player"},
+    {"tag": "BT/", "name": "Bluetooth"},
+    {"tag": "USB", "name": "USB-C"},
+    {"tag": "OPT", "name": "Optical"},
+    {"tag": "COA", "name": "Coaxial"},
+]
+
+OUTPUTS = [
+    {"tag": "XLR/", "name": "XLR", "enable": 1},
+    {"tag": "RCA/", "name": "RCA", "enable": 1},
+    {"tag": "XLRRCA/", "name": "XLR/RCA", "enable": 1},
+    {"tag": "IIS/", "name": "IIS", "enable": 0},
+    {"tag": "HDMI/", "name": "HDMI", "enable": 1},
+]
+
+VU_MODES = ["VU Meter 1", "VU Meter 2", "VU Meter 3", "VU Meter 4"]
+SPECTRUM_MODES = ["Spectrum 1", "Spectrum 2", "Spectrum 3", "Spectrum 4"]
+
+# Placeholder album art with JPEG start and end markers
+IMAGE = b"\xff\xd8\xff\xe0" + bytes(2048) + b"\xff\xd9"
+
+
+@dataclass
+class Faults:
+    """Faults injected into responses."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    drop_rate: float = 0.0
+    error_rate: float = 0.0
+    slow_body: float = 0.0
+
+
+@dataclass
+class DeviceState:
+    """Mutable state of the emulated device."""
+
+    powered: bool = True
+    playing: bool = True
+    track: int = 0
+    position_ms: int = 0
+    position_at: float = field(default_factory=time.monotonic)
+    volume: int = 40
+    max_volume: int = 100
+    muted: bool = False
+    input_index: int = 0
+    output_index: int = 0
+    screen_on: bool = True
+    screen_brightness: int = 80
+    knob_brightness: int = 128
+    vu_index: int = 0
+    spectrum_index: int = 0
+
+    def position(self) -> int:
+        """Return the playback position in milliseconds."""
+        if not self.playing:
+            return self.position_ms
+        elapsed = int((time.monotonic() - self.position_at) * 1000)
+        return min(self.position_ms + elapsed, TRACKS[self.track]["duration"])
+
+    def seek(self, position_ms: int) -> None:
+        """Move the playback position."""
+        self.position_ms = position_ms
+        self.position_at = time.monotonic()
+
+    def change_track(self, step: int) -> None:
+        """Skip forward or backward."""
+        self.track = (self.track + step) % len(TRACKS)
+        self.seek(0)
+
+
+class EversoloEmulator:
+    """aiohttp application emulating the Eversolo HTTP API."""
+
+    def __init__(
+        self,
+        faults: Faults | None = None,
+        endpoint_faults: dict[str, Faults] | None = None,
+        seed: int | None = None,
+        unsupported: Iterable[str] = (),
+    ) -> None:
+        """Initialize the emulator."""
+        self.state = DeviceState()
+        self.faults = faults or Faults()
+        self.endpoint_faults = endpoint_faults or {}
+        # Endpoints answered with 404, like on models without the feature
+        self.unsupported = set(unsupported)
+        self.requests: Counter[str] = Counter()
+        self._transports: weakref.WeakSet = weakref.WeakSet()
+        self._connections = 0
+        self._random = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self.port: int | None = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/{path:.*}", self._handle)
+        self._handlers = {
+            "getState": self._get_state,
+            "getInputAndOutputList": self._get_input_output_list,
+            "getPowerOption": self._get_power_option,
+            "setPowerOption": self._set_power_option,
+            "changVUDisplay": self._ok,
+            "setMuteVolume": self._set_mute_volume,
+            "playOrPause": self._play_or_pause,
+            "playLast": self._play_last,
+            "playNext": self._play_next,
+            "seekTo": self._seek_to,
+            "setDevicesVolume": self._set_devices_volume,
+            "setInputList": self._set_input_list,
+            "setOutInputList": self._set_out_input_list,
+            "getImage": self._get_image,
+            "getScreenBrightness": self._get_screen_brightness,
+            "setScreenBrightness": self._set_screen_brightness,
+            "getKnobBrightness": self._get_knob_brightness,
+            "setKnobBrightness": self._set_knob_brightness,
+            "getVUModeList": self._get_vu_mode_list,
+            "setVUMode": self._set_vu_mode,
+            "getSpPlayModeList": self._get_spectrum_mode_list,
+            "setSpPlayModeList": self._set_spectrum_mode_list,
+            "getModel": self._get_model,
+            "sendkey": self._send_key,
+        }
+
+    @property
+    def connections(self) -> int:
+        """Return the number of TCP connections accepted so far."""
+        return self._connections
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start serving and return the bound port."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        """Dispatch a request, applying the configured faults."""
+        endpoint = request.path.rsplit("/", 1)[-1]
+        self.requests[endpoint] += 1
+        if request.transport not in self._transports:
+            self._transports.add(request.transport)
+            self._connections += 1
+        faults = self.endpoint_faults.get(endpoint, self.faults)
+
+        delay = faults.latency + faults.jitter * self._random.random()
+        if delay:
+            await asyncio.sleep(delay)
+
+        if not self.state.powered or self._random.random() < faults.drop_rate:
+            if request.transport is not None:
+                request.transport.close()
+            raise web.HTTPServiceUnavailable
+
+        if self._random.random() < faults.error_rate:
+            raise web.HTTPInternalServerError
+
+        handler = self._handlers.get(endpoint)
+        if handler is None or endpoint in self.unsupported:
+            raise web.HTTPNotFound
+
+        response = handler(request.query)
+        if faults.slow_body and response.body is not None:
+            return await self._write_slowly(request, response, faults.slow_body)
+        return response
+
+    async def _write_slowly(
+        self, request: web.Request, response: web.Response, seconds: float
+    ) -> web.StreamResponse:
+        """Send a response body in small chunks spread over the given time."""
+        body = response.body
+        stream = web.StreamResponse(status=response.status)
+        stream.content_type = response.content_type
+        await stream.prepare(request)
+        chunks = [body[i:i + 64] for i in range(0, len(body), 64)] or [b""]
+        for chunk in chunks:
+            await stream.write(chunk)
+            await asyncio.sleep(seconds / len(chunks))
+        await stream.write_eof()
+        return stream
+
+    @staticmethod
+    def _json(data: dict) -> web.Response:
+        """Return a JSON response the way the device does (text/plain)."""
+        return web.Response(text=json.dumps(data), content_type="text/plain")
+
+    def _ok(self, _query) -> web.Response:
+        return self._json({"status": 200})
+
+    def _get_state(self, _query) -> web.Response:
+        state = self.state
+        track = TRACKS[state.track]
+        return self._json({
+            "status": 200,
+            "state": 3 if state.playing else 4,
+            "playType": 5,
+            "duration": track["duration"],
+            "position": state.position(),
+            "volumeData": {
+                "currenttVolume": state.volume,
+                "maxVolume": state.max_volume,
+                "isMute": state.muted,
+            },
+            "playingMusic": {
+                "id": track["id"],
+                "title": track["title"],
+                "artist": track["artist"],
+                "album": track["album"],
+                "albumArt": "",
+                "bitrate": "1411kbps",
+                "sampleRate": "44.1kHz",
+                "bits": "16bit",
+                "extension": "FLAC",
+            },
+            "everSoloPlayInfo": {
+                "icon": "",
+                "everSoloPlayAudioInfo": {
+                    "songName": "",
+                    "artistName": "",
+                    "albumName": "",
+                },
+            },
+        })
+
+    def _get_input_output_list(self, _query) -> web.Response:
+        return self._json({
+            "status": 200,
+            "inputIndex": self.state.input_index,
+            "inputData": INPUTS,
+            "outputIndex": self.state.output_index,
+            "outputData": OUTPUTS,
+        })
+
+    def _get_power_option(self, _query) -> web.Response:
+        return self._json({
+            "status": 200,
+            "data": [
+                {"tag": "poweroff", "name": "Power off"},
+                {"tag": "reboot", "name": "Reboot"},
+                {"tag": "screen",
+                    "name": "Screen off" if self.state.screen_on else "Screen on"},
+            ],
+        })
+
+    def _set_power_option(self, query) -> web.Response:
+        tag = query.get("tag")
+        if tag == "poweroff":
+            self.state.powered = False
+        elif tag == "reboot":
+            self.state = DeviceState()
+        elif tag == "screen":
+            self.state.screen_on = not self.state.screen_on
+        return self._ok(query)
+
+    def _set_mute_volume(self, query) -> web.Response:
+        self.state.muted = query.get("isMute") == "1"
+        return self._ok(query)
+
+    def _play_or_pause(self, query) -> web.Response:
+        self.state.seek(self.state.position())
+        self.state.playing = not self.state.playing
+        return self._ok(query)
+
+    def _play_last(self, query) -> web.Response:
+        self.state.change_track(-1)
+        return self._ok(query)
+
+    def _play_next(self, query) -> web.Response:
+        self.state.change_track(1)
+        return self._ok(query)
+
+    def _seek_to(self, query) -> web.Response:
+        self.state.seek(int(query.get("time", 0)))
+        return self._ok(query)
+
+    def _set_devices_volume(self, query) -> web.Response:
+        volume = int(query.get("volume", self.state.volume))
+        self.state.volume = max(0, min(volume, self.state.max_volume))
+        return self._ok(query)
+
+    def _set_input_list(self, query) -> web.Response:
+        self.state.input_index = int(query.get("index", 0))
+        return self._ok(query)
+
+    def _set_out_input_list(self, query) -> web.Response:
+        self.state.output_index = int(query.get("index", 0))
+        return self._ok(query)
+
+    def _get_image(self, _query) -> web.Response:
+        return web.Response(body=IMAGE, content_type="image/jpeg")
+
+    def _get_screen_brightness(self, _query) -> web.Response:
+        return self._json({"status": 200, "currentValue": self.state.screen_brightness})
+
+    def _set_screen_brightness(self, query) -> web.Response:
+        self.state.screen_brightness = int(query.get("index", 0))
+        return self._ok(query)
+
+    def _get_knob_brightness(self, _query) -> web.Response:
+        return self._json({"status": 200, "currentValue": self.state.knob_brightness})
+
+    def _set_knob_brightness(self, query) -> web.Response:
+        self.state.knob_brightness = int(query.get("index", 0))
+        return self._ok(query)
+
+    def _get_vu_mode_list(self, _query) -> web.Response:
+        return self._json({
+            "status": 200,
+            "currentIndex": self.state.vu_index,
+            "data": [{"title": title, "tag": str(index)}
+                     for index, title in enumerate(VU_MODES)],
+        })
+
+    def _set_vu_mode(self, query) -> web.Response:
+        self.state.vu_index = int(query.get("index", 0))
+        return self._ok(query)
+
+    def _get_spectrum_mode_list(self, _query) -> web.Response:
+        return self._json({
+            "status": 200,
+            "currentIndex": self.state.spectrum_index,
+            "data": [{"title": title, "tag": str(index)}
+                     for index, title in enumerate(SPECTRUM_MODES)],
+        })
+
+    def _set_spectrum_mode_list(self, query) -> web.Response:
+        self.state.spectrum_index = int(query.get("index", 0))
+        return self._ok(query)
+
+    def _get_model(self, _query) -> web.Response:
+        return self._json({
+            "status": 200,
+            "model": "DMP-A6",
+            "firmware": "v1.3.80",
+            "net_mac": "02:00:00:00:a6:01",
+            "ableRemoteBoot": True,
+        })
+
+    def _send_key(self, query) -> web.Response:
+        key = query.get("key")
+        if key == "Key.Screen.ON":
+            self.state.screen_on = True
+        elif key == "Key.Screen.OFF":
+            self.state.screen_on = False
+        elif key == "Key.VolumeUp":
+            self.state.volume = min(self.state.volume + 1, self.state.max_volume)
+        elif key == "Key.VolumeDown":
+            self.state.volume = max(self.state.volume - 1, 0)
+        return self._ok(query)
+
+
+def main() -> None:
+    """Run the emulator until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9529)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="random extra seconds, up to this value")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="fraction of connections closed without response")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests answered with HTTP 500")
+    parser.add_argument("--slow-body", type=float, default=0.0,
+                        help="seconds over which each body is trickled")
+    parser.add_argument("--slow-endpoint", action="append", default=[],
+                        metavar="NAME=SECONDS",
+                        help="extra latency for a single endpoint, e.g. getVUModeList=5")
+    parser.add_argument("--unsupported", action="append", default=[],
+                        metavar="NAME",
+                        help="answer an endpoint with 404, e.g. getKnobBrightness")
+    args = parser.parse_args()
+
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        error_rate=args.error_rate,
+        slow_body=args.slow_body,
+    )
+    endpoint_faults = {}
+    for item in args.slow_endpoint:
+        name, seconds = item.split("=", 1)
+        endpoint_faults[name] = replace(
+            faults, latency=faults.latency + float(seconds))
+
+    async def run() -> None:
+        emulator = EversoloEmulator(
+            faults, endpoint_faults, unsupported=args.unsupported)
+        port = await emulator.async_start(args.host, args.port)
+        print(f"Eversolo emulator listening on http://{args.host}:{port}")  # noqa: T201
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await emulator.async_stop()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
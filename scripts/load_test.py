@@ -0,0 +1,144 @@
+"""Load test polling many emulated Eversolo devices from one event loop.
+
+Starts one emulator per device and polls each with its own
+EversoloApiClient, scheduled like DataUpdateCoordinator schedules its
+refreshes (whole second plus an offset). A probe task measures event
+loop lag throughout the run.
+
+    python scripts/load_test.py --devices 50 --duration 30
+    python scripts/load_test.py --devices 50 --no-stagger
+
+Requires the development requirements (requirements.txt).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from custom_components.eversolo.api import (  # noqa: E402
+    EversoloApiClient,
+    EversoloApiClientError,
+)
+from custom_components.eversolo.scheduler import EversoloPollScheduler  # noqa: E402
+from emulator import EversoloEmulator, Faults  # noqa: E402
+
+PROBE_INTERVAL = 0.01
+
+
+async def probe_loop_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """Record how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(loop.time() - expected, 0.0))
+
+
+async def poll_device(
+    client: EversoloApiClient,
+    offset: float,
+    interval: float,
+    stop: asyncio.Event,
+    cycles: list[float],
+) -> None:
+    """Poll a device on the whole second plus its offset until stopped."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        next_poll = int(loop.time()) + offset + interval
+        await asyncio.sleep(max(next_poll - loop.time(), 0))
+        start = time.perf_counter()
+        with contextlib.suppress(EversoloApiClientError):
+            await client.async_get_data()
+        cycles.append(time.perf_counter() - start)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Run the load test and return its results."""
+    scheduler = EversoloPollScheduler(max_in_flight=args.max_in_flight)
+    emulators = [
+        EversoloEmulator(Faults(latency=args.latency, jitter=args.jitter), seed=index)
+        for index in range(args.devices)
+    ]
+    ports = [await emulator.async_start() for emulator in emulators]
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    cycles: list[float] = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            tasks = [asyncio.create_task(probe_loop_lag(stop, lags))]
+            for port in ports:
+                device = f"127.0.0.1:{port}"
+                client = EversoloApiClient(
+                    "127.0.0.1",
+                    port,
+                    session,
+                    shared_semaphore=scheduler.semaphore if args.stagger else None,
+                )
+                # Without staggering, mimic the default random offset of
+                # DataUpdateCoordinator (50-500 ms)
+                offset = (
+                    scheduler.acquire_offset(device)
+                    if args.stagger
+                    else random.uniform(0.05, 0.5)
+                )
+                tasks.append(asyncio.create_task(
+                    poll_device(client, offset, args.interval, stop, cycles)))
+
+            await asyncio.sleep(args.duration)
+            stop.set()
+            await asyncio.gather(*tasks)
+    finally:
+        for emulator in emulators:
+            await emulator.async_stop()
+
+    lags.sort()
+    cycles.sort()
+    return {
+        "devices": args.devices,
+        "stagger": args.stagger,
+        "requests": sum(sum(emulator.requests.values()) for emulator in emulators),
+        "cycles": len(cycles),
+        "cycle_ms_median": statistics.median(cycles) * 1000,
+        "cycle_ms_p99": cycles[int(len(cycles) * 0.99)] * 1000,
+        "loop_lag_ms_median": statistics.median(lags) * 1000,
+        "loop_lag_ms_p99": lags[int(len(lags) * 0.99)] * 1000,
+        "loop_lag_ms_max": lags[-1] * 1000,
+    }
+
+
+def main() -> None:
+    """Run the load test and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30,
+                        help="seconds to run")
+    parser.add_argument("--interval", type=float, default=1,
+                        help="poll interval in seconds")
+    parser.add_argument("--latency", type=float, default=0.03,
+                        help="emulated device latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02,
+                        help="emulated device jitter in seconds")
+    parser.add_argument("--max-in-flight", type=int, default=32,
+                        help="global cap on requests in flight")
+    parser.add_argument("--no-stagger", dest="stagger", action="store_false",
+                        help="use random offsets and no global cap")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Fixtures for the Eversolo tests."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+import os
+import sys
+
+import aiohttp
+from homeassistant.const import CONF_HOST, CONF_PORT
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.eversolo.api import EversoloApiClient
+from custom_components.eversolo.const import DEFAULT_PORT, DOMAIN
+from custom_components.eversolo.coordinator import EversoloDataUpdateCoordinator
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+from emulator import EversoloEmulator  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components in every test."""
+    return
+
+
+class FakeClock:
+    """Monotonic clock advanced by hand."""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        """Initialize the clock."""
+        self.now = now
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward."""
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Return a fake monotonic clock."""
+    return FakeClock()
+
+
+def mock_config_entry(port: int = DEFAULT_PORT, **data) -> MockConfigEntry:
+    """Return a config entry of a device on localhost."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="127.0.0.1",
+        data={CONF_HOST: "127.0.0.1", CONF_PORT: port, **data},
+        unique_id=f"127.0.0.1:{port}",
+    )
+
+
+@pytest.fixture
+def config_entry(hass):
+    """Return a config entry added to hass, not set up."""
+    entry = mock_config_entry()
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+def coordinator(hass, config_entry) -> EversoloDataUpdateCoordinator:
+    """Return a coordinator of the config entry that was never refreshed."""
+    return EversoloDataUpdateCoordinator(
+        hass,
+        config_entry,
+        EversoloApiClient("127.0.0.1", DEFAULT_PORT, session=None),
+    )
+
+
+@pytest.fixture
+async def emulator(socket_enabled) -> AsyncIterator[EversoloEmulator]:
+    """Return a running emulated device."""
+    emulator = EversoloEmulator(seed=0)
+    await emulator.async_start()
+    yield emulator
+    await emulator.async_stop()
+
+
+@pytest.fixture
+async def client(emulator: EversoloEmulator) -> AsyncIterator[EversoloApiClient]:
+    """Return a client of the emulated device."""
+    async with aiohttp.ClientSession() as session:
+        yield EversoloApiClient("127.0.0.1", emulator.port, session)
+
+
+@pytest.fixture
+async def device_coordinator(
+    hass, emulator: EversoloEmulator, client: EversoloApiClient
+) -> EversoloDataUpdateCoordinator:
+    """Return a coordinator of the emulated device that was never refreshed."""
+    entry = mock_config_entry(emulator.port)
+    entry.add_to_hass(hass)
+    return EversoloDataUpdateCoordinator(hass, entry, client)
+
+
+@pytest.fixture
+async def loaded_entry(hass, emulator: EversoloEmulator) -> AsyncIterator[MockConfigEntry]:
+    """Return an entry of the emulated device, set up and refreshed once."""
+    entry = mock_config_entry(emulator.port)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    yield entry
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
@@ -0,0 +1,116 @@
+"""Tests for the Eversolo API client."""
+from __future__ import annotations
+
+import asyncio
+
+import aiohttp
+from emulator import INPUTS, Faults
+import pytest
+
+from custom_components.eversolo.api import (
+    EversoloApiClient,
+    EversoloApiClientCommunicationError,
+    EversoloApiClientError,
+    _display_brightness_from_index,
+    _display_brightness_to_index,
+)
+from custom_components.eversolo.const import POLL_TIERS
+
+
+@pytest.mark.parametrize("brightness", range(256))
+def test_display_brightness_quantization(brightness: int) -> None:
+    """The quantized brightness is what the device reports after a set."""
+    quantized = EversoloApiClient.quantize_display_brightness(brightness)
+
+    assert quantized == _display_brightness_from_index(
+        _display_brightness_to_index(brightness))
+    assert abs(quantized - brightness) <= 2
+    # Setting the reported value again does not move it
+    assert EversoloApiClient.quantize_display_brightness(quantized) == quantized
+
+
+def test_display_brightness_readback() -> None:
+    """128 is stored as index 58 and read back as 129."""
+    assert EversoloApiClient.quantize_display_brightness(128) == 129
+
+
+async def test_probe_all_supported(client, emulator) -> None:
+    """Every endpoint the device answers with data is supported."""
+    supported, data = await client.async_probe_capabilities()
+
+    assert supported == set(data) == set(POLL_TIERS)
+
+
+async def test_probe_not_found_is_unsupported(client, emulator) -> None:
+    """An endpoint the device answers with 404 is unsupported."""
+    emulator.unsupported.add("getVUModeList")
+
+    supported, data = await client.async_probe_capabilities()
+
+    assert "vu_mode_state" not in supported
+    assert "vu_mode_state" not in data
+    assert "spectrum_mode_state" in supported
+
+
+@pytest.mark.parametrize(
+    "faults", [Faults(error_rate=1), Faults(drop_rate=1)], ids=["5xx", "reset"])
+async def test_probe_raises_on_other_failures(client, emulator, faults) -> None:
+    """A failure other than 404 does not mark an endpoint as unsupported."""
+    emulator.endpoint_faults["getVUModeList"] = faults
+
+    with pytest.raises(EversoloApiClientCommunicationError):
+        await client.async_probe_capabilities()
+
+
+async def test_probe_required_endpoint_unsupported(client, emulator) -> None:
+    """A probe fails if a required endpoint is missing."""
+    emulator.unsupported.add("getInputAndOutputList")
+
+    with pytest.raises(EversoloApiClientError, match="input_output_state"):
+        await client.async_probe_capabilities()
+
+
+async def test_deadline_abandons_slow_endpoints(client, emulator) -> None:
+    """Endpoints pending at the deadline are left out and raise their RTT."""
+    emulator.endpoint_faults["getVUModeList"] = Faults(latency=1)
+    emulator.endpoint_faults["getState"] = Faults(latency=0.3)
+    client.metrics.record_success("getVUModeList", 0.01)
+
+    data = await client.async_get_data(
+        ["music_control_state", "vu_mode_state", "knob_brightness"],
+        deadline=0.1,
+        always_wait=("music_control_state",),
+    )
+
+    assert set(data) == {"music_control_state", "knob_brightness"}
+    assert client.metrics.abandoned == {"vu_mode_state": 1}
+    # The abandoned request is cancelled in the background
+    await asyncio.sleep(0.01)
+    assert client.metrics.endpoint("getVUModeList").rtt.srtt > 0.01
+
+
+async def test_option_index_reused_while_unchanged(emulator, monkeypatch) -> None:
+    """Sources are indexed once per change of the list, not once per poll."""
+    async with aiohttp.ClientSession() as session:
+        client = EversoloApiClient(
+            "127.0.0.1", emulator.port, session, response_cache_ttl=0)
+
+        first = (await client.async_get_data(["input_output_state"]))[
+            "input_output_state"]
+        second = (await client.async_get_data(["input_output_state"]))[
+            "input_output_state"]
+        monkeypatch.setattr(
+            "emulator.INPUTS", [*INPUTS, {"tag": "HDMI", "name": "HDMI ARC"}])
+        changed = (await client.async_get_data(["input_output_state"]))[
+            "input_output_state"]
+
+    assert emulator.requests["getInputAndOutputList"] == 3
+    assert second is not first
+    assert second["transformed_sources"] is first["transformed_sources"]
+    assert second["transformed_outputs"] is first["transformed_outputs"]
+    sources = changed["transformed_sources"]
+    assert sources is not first["transformed_sources"]
+    assert sources.options == [source["name"] for source in INPUTS] + ["HDMI ARC"]
+    assert sources.by_name["HDMI ARC"] == (len(INPUTS), "HDMI")
+    assert sources.by_tag["BT"] == 1
+    assert changed["transformed_outputs"] is first["transformed_outputs"]
@@ -0,0 +1,77 @@
+"""Tests for the latest-wins command coalescing."""
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.eversolo.api import _LatestValueCommand
+
+BURST = 50
+
+
+async def _burst(send, values, interval: float = 0.001) -> list[bool]:
+    """Submit values the way a dragged slider does, return which were sent."""
+    tasks = []
+    for value in values:
+        tasks.append(asyncio.create_task(send(value)))
+        await asyncio.sleep(interval)
+    return await asyncio.gather(*tasks)
+
+
+async def test_slider_burst_sends_first_and_last() -> None:
+    """Values submitted while one is in flight are dropped, but the last."""
+    sent = []
+
+    async def send(value) -> None:
+        sent.append(value)
+        await asyncio.sleep(0.02)
+
+    command = _LatestValueCommand(send)
+    results = await _burst(command.async_send, range(BURST))
+
+    assert sent[0] == 0
+    assert sent[-1] == BURST - 1
+    assert sent == sorted(sent)
+    assert len(sent) < BURST / 5
+    assert [value for value, was_sent in zip(range(BURST), results) if was_sent] == sent
+
+
+async def test_values_sent_one_at_a_time() -> None:
+    """A value is only sent once the previous request finished."""
+    in_flight = 0
+    most_in_flight = 0
+
+    async def send(_value) -> None:
+        nonlocal in_flight, most_in_flight
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+        await asyncio.sleep(0.005)
+        in_flight -= 1
+
+    command = _LatestValueCommand(send)
+    await _burst(command.async_send, range(BURST))
+
+    assert most_in_flight == 1
+
+
+async def test_single_value_is_sent() -> None:
+    """Without contention every value is sent."""
+    sent = []
+
+    async def send(value) -> None:
+        sent.append(value)
+
+    command = _LatestValueCommand(send)
+    assert await command.async_send(1)
+    assert await command.async_send(2)
+    assert sent == [1, 2]
+
+
+async def test_slider_burst_against_device(client, emulator) -> None:
+    """A volume slider burst reaches the device as a few requests."""
+    emulator.faults.latency = 0.02
+
+    results = await _burst(client.async_set_volume, range(BURST))
+
+    assert results[-1] is True
+    assert emulator.requests["setDevicesVolume"] < BURST / 5
+    assert emulator.state.volume == BURST - 1
@@ -0,0 +1,52 @@
+"""Tests for the Eversolo config flow."""
+from __future__ import annotations
+
+from homeassistant import config_entries
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.eversolo.const import DOMAIN
+
+from .conftest import mock_config_entry
+
+
+async def test_create_entry(hass, emulator) -> None:
+    """A reachable device creates an entry identified by host and port."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER})
+    assert result["type"] is FlowResultType.FORM
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: "127.0.0.1", CONF_PORT: emulator.port})
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["result"].unique_id == f"127.0.0.1:{emulator.port}"
+    await hass.async_block_till_done()
+    assert await hass.config_entries.async_unload(result["result"].entry_id)
+
+
+async def test_unreachable_device(hass, emulator) -> None:
+    """An unreachable device shows a connection error."""
+    emulator.state.powered = False
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER})
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: "127.0.0.1", CONF_PORT: emulator.port})
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "connection"}
+
+
+async def test_duplicate_device_aborts(hass, emulator) -> None:
+    """A device that is already configured is not added twice."""
+    mock_config_entry(emulator.port).add_to_hass(hass)
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER})
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: "127.0.0.1", CONF_PORT: emulator.port})
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+    assert emulator.requests == {}
@@ -0,0 +1,294 @@
+"""Tests for the Eversolo coordinator."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+from emulator import Faults
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+import pytest
+
+from custom_components.eversolo.api import (
+    EversoloApiClientAuthenticationError,
+    EversoloApiClientCommunicationError,
+)
+from custom_components.eversolo.const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_MAX,
+    BREAKER_RESET_MIN,
+    CONF_CAPABILITIES,
+    CONF_NET_MAC,
+    DEVICE_REQUEST_BURST,
+    DEVICE_REQUEST_RATE,
+    POLL_TIERS,
+    RESPONSE_CACHE_TTL,
+    STALE_DATA_TTL,
+)
+from custom_components.eversolo.scheduler import CircuitBreaker
+
+
+async def _fail():
+    raise EversoloApiClientCommunicationError("Device did not answer")
+
+
+async def _succeed():
+    return True
+
+
+async def test_optimistic_value_confirmed_by_device(coordinator) -> None:
+    """A fetched value equal to the optimistic one ends the override."""
+    coordinator.data = coordinator._merge({"display_brightness": 100}, dt_util.utcnow())
+
+    await coordinator.async_optimistic_command(
+        _succeed(), "display_brightness", (), 129)
+    assert coordinator.data["display_brightness"] == 129
+
+    coordinator.data = coordinator._merge(
+        {"display_brightness": 129}, dt_util.utcnow())
+    assert not coordinator._optimistic
+
+
+async def test_optimistic_value_overrides_until_confirmed(coordinator) -> None:
+    """A fetched value the command has not reached yet is overridden."""
+    coordinator.data = coordinator._merge(
+        {"display_brightness": 100}, dt_util.utcnow())
+
+    await coordinator.async_optimistic_command(
+        _succeed(), "display_brightness", (), 129)
+    data = coordinator._merge({"display_brightness": 100}, dt_util.utcnow())
+
+    assert data["display_brightness"] == 129
+
+
+async def test_failed_command_rolls_back_to_device_value(coordinator) -> None:
+    """A failed command restores the reported value, not an optimistic one."""
+    coordinator.data = coordinator._merge(
+        {"display_brightness": 100}, dt_util.utcnow())
+    await coordinator.async_optimistic_command(
+        _succeed(), "display_brightness", (), 129)
+
+    with pytest.raises(EversoloApiClientCommunicationError):
+        await coordinator.async_optimistic_command(
+            _fail(), "display_brightness", (), 200)
+
+    assert coordinator.data["display_brightness"] == 100
+
+
+async def test_optimistic_value_times_out(coordinator) -> None:
+    """The device wins once the optimistic value was not confirmed in time."""
+    coordinator.data = coordinator._merge(
+        {"display_brightness": 100}, dt_util.utcnow())
+    await coordinator.async_optimistic_command(
+        _succeed(), "display_brightness", (), 129)
+
+    # Let the deadline pass
+    coordinator._optimistic = {
+        key: (value, 0) for key, (value, _) in coordinator._optimistic.items()
+    }
+    data = coordinator._merge({"display_brightness": 100}, dt_util.utcnow())
+
+    assert data["display_brightness"] == 100
+
+
+async def test_failed_probe_backs_off(device_coordinator, emulator) -> None:
+    """A failed probe is not repeated on every poll."""
+    coordinator = device_coordinator
+    probes = 0
+    probe = coordinator.client.async_probe_capabilities
+
+    async def count_probes():
+        nonlocal probes
+        probes += 1
+        return await probe()
+
+    coordinator.client.async_probe_capabilities = count_probes
+    emulator.endpoint_faults["getVUModeList"] = Faults(error_rate=1)
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_poll(5)
+    data = await coordinator._async_poll(5)
+    await coordinator._async_poll(5)
+
+    assert probes == 1
+    assert "music_control_state" in data
+    assert CONF_CAPABILITIES not in coordinator.config_entry.data
+
+
+async def test_unchanged_probe_keeps_schedule(device_coordinator, emulator) -> None:
+    """Storing the same capabilities again keeps the poll schedule."""
+    coordinator = device_coordinator
+    emulator.unsupported.add("getVUModeList")
+    coordinator.data = await coordinator._async_poll(5)
+    assert coordinator.config_entry.data[CONF_CAPABILITIES] == sorted(
+        set(POLL_TIERS) - {"vu_mode_state"})
+    scheduler = coordinator._scheduler
+    assert "vu_mode_state" not in scheduler.intervals
+    next_due = dict(scheduler._next_due)
+
+    coordinator._store_capabilities(
+        set(coordinator.config_entry.data[CONF_CAPABILITIES]))
+
+    assert coordinator._scheduler is scheduler
+    assert scheduler._next_due == next_due
+
+
+async def _offline(timeout):
+    return False
+
+
+async def test_offline_first_refresh_serves_snapshot(device_coordinator) -> None:
+    """A restored snapshot stays available if the device is offline at setup."""
+    coordinator = device_coordinator
+    await coordinator._snapshot.async_save({"display_brightness": 100})
+    coordinator.client.async_check_connection = _offline
+
+    assert await coordinator.async_restore_snapshot()
+    await coordinator.async_first_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data["display_brightness"] == 100
+
+
+async def test_offline_first_refresh_without_snapshot(device_coordinator) -> None:
+    """Without a snapshot an offline device is unavailable right away."""
+    coordinator = device_coordinator
+    coordinator.client.async_check_connection = _offline
+
+    assert not await coordinator.async_restore_snapshot()
+    await coordinator.async_first_refresh()
+
+    assert not coordinator.last_update_success
+
+
+async def test_failed_poll_serves_snapshot_until_ttl(
+    device_coordinator, emulator
+) -> None:
+    """Restored data is served while polls fail, for up to STALE_DATA_TTL."""
+    coordinator = device_coordinator
+    await coordinator._snapshot.async_save({"display_brightness": 100})
+    await coordinator.async_restore_snapshot()
+    emulator.state.powered = False
+
+    data = await coordinator._async_poll(5)
+    assert data["display_brightness"] == 100
+
+    coordinator._last_answer -= STALE_DATA_TTL + 1
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_poll(5)
+
+
+async def test_slow_endpoint_misses_cycle_deadline(device_coordinator, emulator) -> None:
+    """A poll keeps the last value of an endpoint pending at its deadline."""
+    coordinator = device_coordinator
+    coordinator.data = await coordinator._async_poll(5)
+    vu_mode_state = coordinator.data["vu_mode_state"]
+    metrics = coordinator.client.metrics
+    srtt = metrics.endpoint("getVUModeList").rtt.srtt
+    emulator.endpoint_faults["getVUModeList"] = Faults(latency=1)
+    emulator.state.vu_index = 2
+    # Let the shared responses of the first poll expire and the device's
+    # rate limit refill, so the next poll waits on the device alone
+    await asyncio.sleep(
+        max(RESPONSE_CACHE_TTL, DEVICE_REQUEST_BURST / DEVICE_REQUEST_RATE))
+    # Poll all endpoints, without probing them again
+    coordinator._store_capabilities(set(POLL_TIERS))
+    coordinator._scheduler.invalidate()
+    coordinator.update_interval = timedelta(seconds=0.25)
+
+    data = await coordinator._async_update_data()
+
+    assert data["vu_mode_state"] == vu_mode_state
+    assert vu_mode_state["currentIndex"] == 0
+    assert emulator.requests["getVUModeList"] == 2
+    assert emulator.requests["getModel"] == 1
+    assert metrics.abandoned == {"vu_mode_state": 1}
+    assert metrics.last_cycle < 0.25
+    assert metrics.cycle_overruns == 0
+    # The abandoned request is cancelled in the background
+    await asyncio.sleep(0.01)
+    assert metrics.endpoint("getVUModeList").rtt.srtt > srtt
+
+
+def _next_poll_in(hass, coordinator) -> float:
+    """Return the seconds until the scheduled poll of a coordinator."""
+    return coordinator._unsub_refresh.__self__.when() - hass.loop.time()
+
+
+async def test_command_reschedules_backed_off_poll(hass, device_coordinator) -> None:
+    """A command moves a poll that was scheduled after a long backoff."""
+    coordinator = device_coordinator
+    remove_listener = coordinator.async_add_listener(lambda: None)
+    coordinator._set_interval(60)
+    coordinator._schedule_refresh()
+    assert _next_poll_in(hass, coordinator) > 50
+
+    await coordinator.async_refresh_endpoints(["display_brightness"])
+
+    assert _next_poll_in(hass, coordinator) <= 2
+    remove_listener()
+
+
+async def test_wake_on_lan_reschedules_backed_off_poll(
+    hass, device_coordinator, monkeypatch
+) -> None:
+    """Waking the device moves a poll that was scheduled after a backoff."""
+    coordinator = device_coordinator
+    sent = []
+    monkeypatch.setattr(
+        "custom_components.eversolo.coordinator.send_magic_packet", sent.append)
+    hass.config_entries.async_update_entry(
+        coordinator.config_entry,
+        data={**coordinator.config_entry.data, CONF_NET_MAC: "02:00:00:00:a6:01"},
+    )
+    remove_listener = coordinator.async_add_listener(lambda: None)
+    for _ in range(10):
+        coordinator._set_interval(coordinator._interval.on_failure())
+    coordinator._schedule_refresh()
+
+    await coordinator.async_send_wol()
+
+    assert sent == ["02:00:00:00:a6:01"]
+    assert _next_poll_in(hass, coordinator) <= 2
+    remove_listener()
+
+
+async def test_partial_refresh_marks_device_available(device_coordinator) -> None:
+    """A device answering a partial refresh is available before the next poll."""
+    coordinator = device_coordinator
+    coordinator.last_update_success = False
+
+    await coordinator.async_refresh_endpoints(["display_brightness"])
+
+    assert coordinator.last_update_success
+    assert coordinator._last_answer is not None
+    assert "display_brightness" in coordinator.data
+
+
+@pytest.mark.parametrize(
+    "exception",
+    [asyncio.CancelledError(), EversoloApiClientAuthenticationError("Denied")],
+    ids=["cancelled", "auth"],
+)
+async def test_interrupted_poll_does_not_keep_circuit_half_open(
+    device_coordinator, clock, exception
+) -> None:
+    """A half-open endpoint is retried again after a poll that got no result."""
+    coordinator = device_coordinator
+    coordinator._store_capabilities(set(POLL_TIERS))
+    coordinator.breaker = CircuitBreaker(clock)
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        coordinator.breaker.record(["knob_brightness"], ())
+    clock.advance(BREAKER_RESET_MIN)
+
+    async def interrupted(*args, **kwargs):
+        raise exception
+
+    coordinator.client.async_get_data = interrupted
+    with pytest.raises((asyncio.CancelledError, ConfigEntryAuthFailed)):
+        await coordinator._async_poll(5)
+
+    assert coordinator.breaker.state("knob_brightness") == CircuitBreaker.OPEN
+    clock.advance(BREAKER_RESET_MAX)
+    assert coordinator.breaker.allow(["knob_brightness"]) == ["knob_brightness"]
@@ -0,0 +1,165 @@
+"""Tests for the album art cache."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.eversolo.api import EversoloApiClientCommunicationError
+from custom_components.eversolo.coordinator import image_cache_path
+from custom_components.eversolo.image_cache import EversoloImageCache
+
+IMAGE = (b"\xff\xd8" + bytes(16) + b"\xff\xd9", "image/jpeg")
+
+
+class FakeFetch:
+    """Image fetch that waits until released and counts its calls."""
+
+    def __init__(self) -> None:
+        """Initialize the fetch."""
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        """Return the image once released."""
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return IMAGE
+
+    @classmethod
+    def released(cls) -> FakeFetch:
+        """Return a fetch that returns the image right away."""
+        fetch = cls()
+        fetch.release.set()
+        return fetch
+
+
+async def test_concurrent_requests_share_a_fetch(hass) -> None:
+    """Requests for the same image while it is fetched share the fetch."""
+    cache = EversoloImageCache(hass, 1024)
+    fetch = FakeFetch()
+
+    tasks = [asyncio.create_task(cache.async_get("song", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await asyncio.gather(*tasks) == [IMAGE] * 5
+    assert fetch.calls == 1
+    assert await cache.async_get("song", fetch) == IMAGE
+    assert fetch.calls == 1
+
+
+async def test_cancelled_first_request_leaves_fetch_to_others(hass) -> None:
+    """Cancelling the request that started a fetch does not cancel the others."""
+    cache = EversoloImageCache(hass, 1024)
+    fetch = FakeFetch()
+
+    first = asyncio.create_task(cache.async_get("song", fetch))
+    await asyncio.sleep(0)
+    joiner = asyncio.create_task(cache.async_get("song", fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await joiner == IMAGE
+    assert first.cancelled()
+    assert not fetch.cancelled
+    assert fetch.calls == 1
+
+
+async def test_fetch_cancelled_when_all_requests_are(hass) -> None:
+    """The fetch stops once nobody waits for it, and is retried later."""
+    cache = EversoloImageCache(hass, 1024)
+    fetch = FakeFetch()
+
+    tasks = [asyncio.create_task(cache.async_get("song", fetch)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert fetch.cancelled
+    fetch.release.set()
+    assert await cache.async_get("song", fetch) == IMAGE
+    assert fetch.calls == 2
+
+
+async def test_failed_fetch_raises_for_every_request(hass) -> None:
+    """A failure reaches every waiting request and is not cached."""
+    cache = EversoloImageCache(hass, 1024)
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise EversoloApiClientCommunicationError("Device did not answer")
+
+    results = await asyncio.gather(
+        *(cache.async_get("song", fail) for _ in range(3)), return_exceptions=True)
+
+    assert calls == 1
+    assert all(
+        isinstance(result, EversoloApiClientCommunicationError) for result in results)
+    with pytest.raises(EversoloApiClientCommunicationError):
+        await cache.async_get("song", fail)
+    assert calls == 2
+
+
+async def test_empty_image_not_cached(hass, tmp_path) -> None:
+    """An empty response is fetched again instead of served from the cache."""
+    cache = EversoloImageCache(hass, 1024, str(tmp_path), 1024)
+    calls = 0
+
+    async def empty():
+        nonlocal calls
+        calls += 1
+        return b"", None
+
+    assert await cache.async_get("song", empty) == (b"", None)
+    assert await cache.async_get("song", empty) == (b"", None)
+
+    assert calls == 2
+    assert not list(tmp_path.iterdir())
+
+
+async def test_disk_cache_per_entry(hass, tmp_path) -> None:
+    """Devices do not share art stored under the same key."""
+    hass.config.config_dir = str(tmp_path)
+    first, second = (
+        EversoloImageCache(hass, 1024, image_cache_path(hass, entry_id), 1024)
+        for entry_id in ("first", "second")
+    )
+    other = (b"\xff\xd8other\xff\xd9", "image/jpeg")
+
+    async def fetch_other():
+        return other
+
+    assert await first.async_get("song:1", FakeFetch.released()) == IMAGE
+    assert await second.async_get("song:1", fetch_other) == other
+
+
+async def test_request_while_fetch_cancelling_starts_anew(hass) -> None:
+    """A request arriving as the last one leaves does not get its cancellation."""
+    cache = EversoloImageCache(hass, 1024)
+    fetch = FakeFetch()
+
+    leaving = asyncio.create_task(cache.async_get("song", fetch))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    leaving.cancel()
+    # Arrives right after the fetch is cancelled, before it finished
+    arriving = asyncio.create_task(cache.async_get("song", fetch))
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await arriving == IMAGE
+    assert fetch.calls == 2
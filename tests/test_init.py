@@ -0,0 +1,181 @@
+"""Tests for setting up and unloading Eversolo entries."""
+from __future__ import annotations
+
+import time
+
+from emulator import Faults
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_HOST, CONF_PORT
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.eversolo.const import (
+    CONF_CAPABILITIES,
+    CONNECT_CHECK_TIMEOUT,
+    DATA_SESSIONS,
+    DOMAIN,
+)
+
+from .conftest import mock_config_entry
+
+
+async def test_setup_and_unload(hass, emulator) -> None:
+    """An entry polls its device once set up and stops once unloaded."""
+    entry = mock_config_entry(emulator.port)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert entry.state is ConfigEntryState.LOADED
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.config_entry is entry
+    assert coordinator.last_update_success
+    assert coordinator.data["music_control_state"]["state"] == 3
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert entry.state is ConfigEntryState.NOT_LOADED
+    assert entry.entry_id not in hass.data[DOMAIN]
+    assert coordinator._shutdown_requested
+    assert not hass.data[DATA_SESSIONS]
+
+
+async def test_setup_does_not_wait_for_first_refresh(hass, emulator) -> None:
+    """Setup completes while the first refresh is still waiting for the device."""
+    emulator.faults = Faults(latency=0.3)
+    entry = mock_config_entry(emulator.port)
+    entry.add_to_hass(hass)
+    start = time.monotonic()
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+
+    assert time.monotonic() - start < 0.3
+    assert entry.state is ConfigEntryState.LOADED
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert not coordinator.last_update_success
+    await hass.async_block_till_done(wait_background_tasks=True)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.last_update_success
+    assert coordinator.data["music_control_state"]["state"] == 3
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_unreachable_device_fails_fast(hass, emulator) -> None:
+    """An unreachable device fails the connect check, not the request timeout."""
+    port = emulator.port
+    await emulator.async_stop()
+    entry = mock_config_entry(port)
+    entry.add_to_hass(hass)
+    start = time.monotonic()
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert time.monotonic() - start < CONNECT_CHECK_TIMEOUT
+    assert entry.state is ConfigEntryState.LOADED
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert not coordinator.last_update_success
+    assert coordinator._interval._failures == 1
+
+    # Scheduled polls pick the device up once it is back
+    await emulator.async_start(port=port)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert hass.data[DOMAIN][entry.entry_id].last_update_success
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_entries_poll_independently(hass, emulator) -> None:
+    """Unloading one entry leaves the coordinators of others running."""
+    first = mock_config_entry(emulator.port)
+    second = mock_config_entry(emulator.port + 1)
+    for entry in (first, second):
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    coordinator = hass.data[DOMAIN][second.entry_id]
+    assert coordinator is not hass.data[DOMAIN][first.entry_id]
+
+    assert await hass.config_entries.async_unload(first.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert second.state is ConfigEntryState.LOADED
+    assert not coordinator._shutdown_requested
+    assert await hass.config_entries.async_unload(second.entry_id)
+
+
+async def test_legacy_entry_gets_unique_id(hass, emulator) -> None:
+    """Entries created before unique ids were set get one on setup."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "127.0.0.1", CONF_PORT: emulator.port},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert entry.unique_id == f"127.0.0.1:{emulator.port}"
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_no_reloads_in_steady_state(hass, emulator) -> None:
+    """Polls that store unchanged device info do not reload the entry."""
+    entry = mock_config_entry(emulator.port)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert CONF_CAPABILITIES in entry.data
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    for _ in range(5):
+        coordinator._device_info_due = 0
+        await coordinator.async_refresh()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.data[DOMAIN][entry.entry_id] is coordinator
+    assert not coordinator._shutdown_requested
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_changed_data_reloads_entry(hass, emulator) -> None:
+    """Changing data the entry was set up from reloads it through HA."""
+    entry = mock_config_entry(emulator.port)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    capabilities = [
+        key for key in entry.data[CONF_CAPABILITIES] if key != "vu_mode_state"]
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_CAPABILITIES: capabilities})
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert coordinator._shutdown_requested
+    reloaded = hass.data[DOMAIN][entry.entry_id]
+    assert reloaded is not coordinator
+    assert reloaded.last_update_success
+    assert not reloaded.supports("vu_mode_state")
+    assert len(hass.data[DATA_SESSIONS]) == 1
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert not hass.data[DATA_SESSIONS]
+
+
+async def test_remove_entry_deletes_album_art(hass, emulator, tmp_path) -> None:
+    """Removing an entry deletes its album art from disk."""
+    hass.config.config_dir = str(tmp_path)
+    entry = mock_config_entry(emulator.port)
+    entry.add_to_hass(hass)
+    path = tmp_path / ".cache" / DOMAIN / "images" / entry.entry_id
+    path.mkdir(parents=True)
+    (path / "art").write_bytes(b"\xff\xd8")
+
+    assert await hass.config_entries.async_remove(entry.entry_id)
+
+    assert not path.exists()
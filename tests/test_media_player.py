@@ -0,0 +1,179 @@
+"""Tests for the Eversolo media player."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.components.media_player import (
+    ATTR_INPUT_SOURCE,
+    ATTR_MEDIA_VOLUME_MUTED,
+    DOMAIN as MEDIA_PLAYER_DOMAIN,
+    SERVICE_SELECT_SOURCE,
+)
+from homeassistant.const import ATTR_ENTITY_ID, SERVICE_VOLUME_MUTE
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+import pytest
+
+from custom_components.eversolo.const import DOMAIN, MEDIA_POSITION_TOLERANCE
+from custom_components.eversolo.media_player import EversoloMediaPlayer
+from custom_components.eversolo.models import EversoloPlaybackState
+
+PLAYING = 3
+PAUSED = 4
+
+
+class PositionReporter:
+    """Feeds getState responses with a position to the media player."""
+
+    def __init__(self, coordinator, clock, state: dict) -> None:
+        """Initialize the reporter from a getState response of the device."""
+        self.coordinator = coordinator
+        self.clock = clock
+        self.state = state
+        self.start = dt_util.utcnow()
+        self.origin = clock.now
+        self.player = EversoloMediaPlayer(coordinator, coordinator.config_entry)
+
+    @property
+    def elapsed(self) -> float:
+        """Return the seconds the fake clock moved since the start."""
+        return self.clock.now - self.origin
+
+    def at(self, seconds: float):
+        """Return the wall-clock time at seconds after the start."""
+        return self.start + timedelta(seconds=seconds)
+
+    def report(
+        self, position: float, play_state: int = PLAYING, requested: float | None = None
+    ) -> None:
+        """Merge a response requested now, or at requested, and update the player."""
+        coordinator = self.coordinator
+        state = {**self.state, "state": play_state, "position": int(position * 1000)}
+        requested_at = self.at(self.elapsed if requested is None else requested)
+        coordinator.data = coordinator._merge(
+            {"music_control_state": state}, requested_at)
+        coordinator.playback = EversoloPlaybackState.from_data(
+            coordinator.data, coordinator.client)
+        self.player._update_media_position()
+
+
+@pytest.fixture
+async def reporter(device_coordinator, clock) -> PositionReporter:
+    """Return a reporter of positions of the emulated device."""
+    data = await device_coordinator.client.async_get_data(["music_control_state"])
+    return PositionReporter(device_coordinator, clock, data["music_control_state"])
+
+
+async def test_first_position_anchors(reporter) -> None:
+    """The first reported position is the anchor."""
+    reporter.report(10)
+
+    assert reporter.player.media_position == 10
+    assert reporter.player.media_position_updated_at == reporter.at(0)
+
+
+async def test_position_interpolated_while_playing(reporter, clock) -> None:
+    """Positions that follow the extrapolation keep the anchor."""
+    reporter.report(10)
+
+    for _ in range(5):
+        clock.advance(1)
+        reporter.report(10 + reporter.elapsed + MEDIA_POSITION_TOLERANCE / 2)
+
+    assert reporter.player.media_position == 10
+    assert reporter.player.media_position_updated_at == reporter.at(0)
+
+
+async def test_position_reanchored_on_drift(reporter, clock) -> None:
+    """A position past the tolerance, e.g. after a seek, re-anchors."""
+    reporter.report(10)
+    clock.advance(5)
+
+    reporter.report(15 + MEDIA_POSITION_TOLERANCE + 0.5)
+
+    assert reporter.player.media_position == 15 + MEDIA_POSITION_TOLERANCE + 0.5
+    assert reporter.player.media_position_updated_at == reporter.at(5)
+
+
+async def test_position_reanchored_on_pause(reporter, clock) -> None:
+    """Pausing re-anchors, and a paused position is not extrapolated."""
+    reporter.report(10)
+    clock.advance(5)
+    reporter.report(15, PAUSED)
+    clock.advance(5)
+    reporter.report(15, PAUSED)
+
+    assert reporter.player.media_position == 15
+    assert reporter.player.media_position_updated_at == reporter.at(5)
+
+
+async def test_stale_response_rejected(reporter, clock) -> None:
+    """A response requested before the current one does not move the position."""
+    clock.advance(5)
+    reporter.report(15)
+
+    reporter.report(60, requested=2)
+
+    assert reporter.coordinator.data["music_control_state"]["position"] == 15000
+    assert reporter.coordinator.fetched_at["music_control_state"] == reporter.at(5)
+    assert reporter.player.media_position == 15
+    assert reporter.player.media_position_updated_at == reporter.at(5)
+
+
+@pytest.fixture
+def entity_id(hass, loaded_entry) -> str:
+    """Return the entity id of the media player of the emulated device."""
+    return er.async_get(hass).async_get_entity_id(
+        MEDIA_PLAYER_DOMAIN, DOMAIN, f"{loaded_entry.entry_id}_media_player")
+
+
+async def test_command_refreshes_affected_endpoints(hass, emulator, entity_id) -> None:
+    """A command re-reads only the state it changes, not every endpoint."""
+    emulator.requests.clear()
+
+    await hass.services.async_call(
+        MEDIA_PLAYER_DOMAIN,
+        SERVICE_VOLUME_MUTE,
+        {ATTR_ENTITY_ID: entity_id, ATTR_MEDIA_VOLUME_MUTED: True},
+        blocking=True,
+    )
+
+    assert set(emulator.requests) == {"setMuteVolume", "getState"}
+    assert hass.states.get(entity_id).attributes[ATTR_MEDIA_VOLUME_MUTED] is True
+
+
+async def test_select_source_refreshes_io_list(hass, emulator, entity_id) -> None:
+    """Selecting a source re-reads the I/O list and the playback state."""
+    emulator.requests.clear()
+
+    await hass.services.async_call(
+        MEDIA_PLAYER_DOMAIN,
+        SERVICE_SELECT_SOURCE,
+        {ATTR_ENTITY_ID: entity_id, ATTR_INPUT_SOURCE: "Optical"},
+        blocking=True,
+    )
+
+    assert set(emulator.requests) == {
+        "setInputList", "getInputAndOutputList", "getState"}
+    assert emulator.state.input_index == 3
+    assert hass.states.get(entity_id).attributes[ATTR_INPUT_SOURCE] == "Optical"
+
+
+@pytest.mark.parametrize(
+    ("source", "index", "name"),
+    [("USB", 2, "USB-C"), ("Bluetooth", 1, "Bluetooth")],
+    ids=["tag", "name"],
+)
+async def test_select_source_by_tag_or_name(
+    hass, emulator, entity_id, source, index, name
+) -> None:
+    """A source is selected by its name or its tag."""
+    await hass.services.async_call(
+        MEDIA_PLAYER_DOMAIN,
+        SERVICE_SELECT_SOURCE,
+        {ATTR_ENTITY_ID: entity_id, ATTR_INPUT_SOURCE: source},
+        blocking=True,
+    )
+
+    assert emulator.state.input_index == index
+    assert hass.states.get(entity_id).attributes[ATTR_INPUT_SOURCE] == name
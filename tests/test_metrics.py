@@ -0,0 +1,76 @@
+"""Tests for the request metrics."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.eversolo.const import (
+    REQUEST_TIMEOUT_MAX,
+    REQUEST_TIMEOUT_MIN,
+    RTT_K,
+)
+from custom_components.eversolo.metrics import EversoloMetrics, RttEstimator
+
+
+def test_timeout_without_samples() -> None:
+    """Until the first sample the longest timeout is used."""
+    assert RttEstimator().timeout() == REQUEST_TIMEOUT_MAX
+
+
+def test_first_sample() -> None:
+    """The first sample sets srtt and half of it as variance (RFC 6298)."""
+    rtt = RttEstimator()
+    rtt.observe(2)
+
+    assert rtt.srtt == 2
+    assert rtt.rttvar == 1
+    assert rtt.timeout() == 2 + RTT_K * 1
+
+
+def test_samples_are_smoothed() -> None:
+    """Later samples move the estimate by RTT_ALPHA and RTT_BETA."""
+    rtt = RttEstimator()
+    rtt.observe(2)
+    rtt.observe(4)
+
+    assert rtt.srtt == pytest.approx(2.25)
+    assert rtt.rttvar == pytest.approx(1.25)
+
+
+def test_timeout_bounds() -> None:
+    """The timeout stays within REQUEST_TIMEOUT_MIN and REQUEST_TIMEOUT_MAX."""
+    fast = RttEstimator()
+    for _ in range(50):
+        fast.observe(0.01)
+    slow = RttEstimator()
+    slow.observe(60)
+
+    assert fast.timeout() == REQUEST_TIMEOUT_MIN
+    assert slow.timeout() == REQUEST_TIMEOUT_MAX
+
+
+def test_timeout_backoff() -> None:
+    """Each timeout doubles the timeout until a request succeeds again."""
+    rtt = RttEstimator()
+    for _ in range(50):
+        rtt.observe(0.01)
+
+    rtt.on_timeout()
+    assert rtt.timeout() == 2 * REQUEST_TIMEOUT_MIN
+    for _ in range(10):
+        rtt.on_timeout()
+    assert rtt.timeout() == REQUEST_TIMEOUT_MAX
+
+    rtt.observe(0.01)
+    assert rtt.timeout() == REQUEST_TIMEOUT_MIN
+
+
+def test_cancelled_request_raises_estimate() -> None:
+    """A request cancelled after longer than srtt counts as a sample."""
+    metrics = EversoloMetrics()
+    metrics.record_success("getState", 0.1)
+
+    metrics.record_cancelled("getState", 0.05)
+    assert metrics.endpoint("getState").rtt.srtt == 0.1
+
+    metrics.record_cancelled("getState", 0.9)
+    assert metrics.endpoint("getState").rtt.srtt == pytest.approx(0.1 + 0.8 / 8)
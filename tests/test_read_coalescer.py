@@ -0,0 +1,129 @@
+"""Tests for sharing identical reads."""
+from __future__ import annotations
+
+import asyncio
+
+from emulator import Faults
+
+from custom_components.eversolo.api import _ReadCoalescer
+from custom_components.eversolo.const import POLL_TIERS
+
+
+class FakeRead:
+    """Read that waits until released and counts its calls."""
+
+    def __init__(self) -> None:
+        """Initialize the read."""
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        """Return a fresh result once released."""
+        self.calls += 1
+        call = self.calls
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"call": call}
+
+
+async def test_concurrent_polls_share_requests(client, emulator) -> None:
+    """Twenty concurrent polls send one request per endpoint."""
+    emulator.faults = Faults(latency=0.05)
+
+    results = await asyncio.gather(*(client.async_get_data() for _ in range(20)))
+
+    assert all(set(result) == set(POLL_TIERS) for result in results)
+    assert len(emulator.requests) == len(POLL_TIERS)
+    assert set(emulator.requests.values()) == {1}
+
+
+async def test_callers_get_copies() -> None:
+    """Every caller gets a copy it may add keys to."""
+    reads = _ReadCoalescer(0)
+    read = FakeRead()
+    read.release.set()
+
+    first, second = await asyncio.gather(
+        reads.async_get("key", read), reads.async_get("key", read))
+    first["derived"] = True
+
+    assert second == {"call": 1}
+    assert read.calls == 1
+
+
+async def test_cancelled_starter_leaves_read_to_others() -> None:
+    """Cancelling the caller that started a read does not fail the others."""
+    reads = _ReadCoalescer(0)
+    read = FakeRead()
+
+    starter = asyncio.create_task(reads.async_get("key", read))
+    await asyncio.sleep(0)
+    joiner = asyncio.create_task(reads.async_get("key", read))
+    await asyncio.sleep(0)
+
+    starter.cancel()
+    await asyncio.sleep(0)
+    read.release.set()
+
+    assert await joiner == {"call": 1}
+    assert starter.cancelled()
+    assert not read.cancelled
+    assert read.calls == 1
+
+
+async def test_read_cancelled_once_every_caller_left() -> None:
+    """A read nobody waits for anymore is cancelled and not shared later."""
+    reads = _ReadCoalescer(0)
+    read = FakeRead()
+
+    tasks = [asyncio.create_task(reads.async_get("key", read)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert read.cancelled
+    read.release.set()
+    assert await reads.async_get("key", read) == {"call": 2}
+
+
+async def test_invalidate_detaches_reads_in_flight() -> None:
+    """Reads after invalidating do not join or reuse earlier ones."""
+    reads = _ReadCoalescer(60)
+    read = FakeRead()
+
+    before = asyncio.create_task(reads.async_get("key", read))
+    await asyncio.sleep(0)
+    reads.invalidate()
+    after = asyncio.create_task(reads.async_get("key", read))
+    await asyncio.sleep(0)
+    read.release.set()
+
+    assert await before == {"call": 1}
+    assert await after == {"call": 2}
+    assert await reads.async_get("key", read) == {"call": 2}
+    assert read.calls == 2
+
+
+async def test_read_joined_while_cancelling_starts_anew() -> None:
+    """A caller arriving as the last one leaves does not join the cancelled read."""
+    reads = _ReadCoalescer(0)
+    read = FakeRead()
+
+    leaving = asyncio.create_task(reads.async_get("key", read))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    leaving.cancel()
+    # Arrives right after the read is cancelled, before it finished
+    arriving = asyncio.create_task(reads.async_get("key", read))
+    await asyncio.sleep(0)
+    read.release.set()
+
+    assert await arriving == {"call": 2}
+    assert leaving.cancelled()
+
@@ -0,0 +1,135 @@
+"""Tests for limiting the requests sent to a device."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import aiohttp
+
+from custom_components.eversolo.api import (
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    EversoloApiClient,
+    _RequestLimiter,
+)
+from custom_components.eversolo.metrics import EversoloMetrics
+
+UNLIMITED_RATE = 1e6
+
+
+async def _use(limiter: _RequestLimiter, priority: int, started: list, name: str):
+    async with limiter.slot(priority):
+        started.append(name)
+        await asyncio.sleep(0)
+
+
+async def test_in_flight_limit() -> None:
+    """No more than max_in_flight requests run at once."""
+    limiter = _RequestLimiter(UNLIMITED_RATE, 100, 2, EversoloMetrics())
+    in_flight = peak = 0
+
+    async def request():
+        nonlocal in_flight, peak
+        async with limiter.slot(PRIORITY_POLL):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(request() for _ in range(10)))
+
+    assert peak == 2
+
+
+async def test_request_rate() -> None:
+    """Past the burst, requests start at the configured rate."""
+    limiter = _RequestLimiter(20, 1, 10, EversoloMetrics())
+    started = []
+    start = time.monotonic()
+
+    await asyncio.gather(
+        *(_use(limiter, PRIORITY_POLL, started, str(index)) for index in range(3)))
+
+    assert started == ["0", "1", "2"]
+    assert time.monotonic() - start >= 0.09
+
+
+async def test_commands_overtake_queued_polls() -> None:
+    """Waiting requests start by priority, then in order of arrival."""
+    metrics = EversoloMetrics()
+    limiter = _RequestLimiter(UNLIMITED_RATE, 100, 1, metrics)
+    started = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot(PRIORITY_POLL):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(_use(limiter, priority, started, name))
+        for priority, name in (
+            (PRIORITY_POLL, "poll 1"),
+            (PRIORITY_COMMAND, "command 1"),
+            (PRIORITY_POLL, "poll 2"),
+            (PRIORITY_COMMAND, "command 2"),
+        )
+    ]
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 4
+    release.set()
+    await asyncio.gather(holder, *waiters)
+
+    assert started == ["command 1", "command 2", "poll 1", "poll 2"]
+    assert metrics.max_queue_depth == 4
+
+
+async def test_cancelled_waiters_free_their_place() -> None:
+    """Cancelled requests, waiting or just started, do not leak slots."""
+    limiter = _RequestLimiter(UNLIMITED_RATE, 100, 1, EversoloMetrics())
+    started = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot(PRIORITY_POLL):
+            await release.wait()
+        # The slot was handed to the next waiter, cancel it before it runs
+        starting.cancel()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(_use(limiter, PRIORITY_POLL, started, "waiting"))
+    starting = asyncio.create_task(_use(limiter, PRIORITY_POLL, started, "starting"))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(holder, waiting, starting, return_exceptions=True)
+
+    await asyncio.wait_for(_use(limiter, PRIORITY_POLL, started, "after"), 1)
+    assert started == ["after"]
+    assert limiter._in_flight == 0
+
+
+async def test_shared_semaphore_not_held_while_queued(emulator) -> None:
+    """A device waiting for its rate limit does not block other devices."""
+    semaphore = asyncio.Semaphore(1)
+    async with aiohttp.ClientSession() as session:
+        throttled, other = (
+            EversoloApiClient(
+                "127.0.0.1", emulator.port, session,
+                shared_semaphore=semaphore, request_rate=rate, request_burst=1,
+            )
+            for rate in (0.01, UNLIMITED_RATE)
+        )
+        await throttled.async_get_data(["knob_brightness"])
+        queued = asyncio.create_task(throttled.async_get_data(["display_brightness"]))
+        await asyncio.sleep(0.01)
+
+        try:
+            data = await asyncio.wait_for(other.async_get_data(["knob_brightness"]), 1)
+        finally:
+            queued.cancel()
+
+    assert "knob_brightness" in data
@@ -0,0 +1,136 @@
+"""Tests for reading and decoding device responses."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+import json
+from types import SimpleNamespace
+
+from aiohttp import ClientSession, web
+import orjson
+import pytest
+
+from custom_components.eversolo.api import EversoloApiClient, EversoloApiClientError
+from custom_components.eversolo.const import MAX_IMAGE_BYTES, MAX_RESPONSE_BYTES
+
+CHUNK = 64 * 1024
+
+
+async def _json(request: web.Request) -> web.Response:
+    """Answer with a JSON string padded to the requested size."""
+    size = int(request.match_info["size"])
+    return web.Response(
+        body=b'"' + b"x" * (size - 2) + b'"', content_type="application/json")
+
+
+async def _image(request: web.Request) -> web.Response:
+    """Answer with an image of the requested size."""
+    return web.Response(
+        body=bytes(int(request.match_info["size"])), content_type="image/jpeg")
+
+
+@pytest.fixture
+async def server(socket_enabled) -> AsyncIterator[str]:
+    """Return the base URL of a server answering with bodies of any size."""
+    app = web.Application()
+    app.router.add_get("/json/{size}", _json)
+    app.router.add_get("/image/{size}", _image)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    yield f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    await runner.cleanup()
+
+
+@pytest.fixture
+async def api(server) -> AsyncIterator[EversoloApiClient]:
+    """Return a client of the server."""
+    async with ClientSession() as session:
+        yield EversoloApiClient("127.0.0.1", 0, session, response_cache_ttl=0)
+
+
+class FakeContent:
+    """Response body of endless chunks that counts the chunks read."""
+
+    def __init__(self) -> None:
+        """Initialize the body."""
+        self.chunks = 0
+
+    async def iter_any(self):
+        """Yield chunks until the reader stops."""
+        while True:
+            self.chunks += 1
+            yield bytes(CHUNK)
+
+
+async def test_json_within_limit(api, server) -> None:
+    """A JSON body up to MAX_RESPONSE_BYTES is decoded."""
+    result = await api._api_wrapper("get", f"{server}/json/{MAX_RESPONSE_BYTES}")
+
+    assert len(result) == MAX_RESPONSE_BYTES - 2
+
+
+async def test_json_over_limit(api, server) -> None:
+    """A JSON body over MAX_RESPONSE_BYTES is rejected."""
+    with pytest.raises(EversoloApiClientError, match="exceeds"):
+        await api._api_wrapper("get", f"{server}/json/{MAX_RESPONSE_BYTES + 1}")
+
+
+async def test_image_limit(api, server) -> None:
+    """Images may be larger than JSON, up to MAX_IMAGE_BYTES."""
+    content, content_type = await api.async_get_image(
+        f"{server}/image/{MAX_IMAGE_BYTES}")
+    assert len(content) == MAX_IMAGE_BYTES
+    assert content_type == "image/jpeg"
+
+    with pytest.raises(EversoloApiClientError, match="exceeds"):
+        await api.async_get_image(f"{server}/image/{MAX_IMAGE_BYTES + 1}")
+
+
+async def test_oversized_content_length_not_read() -> None:
+    """A body announced as too large is rejected before reading any of it."""
+    content = FakeContent()
+    response = SimpleNamespace(content_length=MAX_RESPONSE_BYTES + 1, content=content)
+
+    with pytest.raises(EversoloApiClientError, match="exceeds"):
+        await EversoloApiClient._read_body(response, MAX_RESPONSE_BYTES)
+
+    assert content.chunks == 0
+
+
+async def test_oversized_stream_not_buffered() -> None:
+    """A body without length stops being read once it exceeds the limit."""
+    content = FakeContent()
+    response = SimpleNamespace(content_length=None, content=content)
+
+    with pytest.raises(EversoloApiClientError, match="exceeds"):
+        await EversoloApiClient._read_body(response, MAX_RESPONSE_BYTES)
+
+    assert content.chunks == MAX_RESPONSE_BYTES // CHUNK + 1
+
+
+def test_decode_json_falls_back_to_stdlib() -> None:
+    """Input the fast decoder rejects is decoded by the standard library."""
+    client = EversoloApiClient("127.0.0.1", 0, None, json_loads=orjson.loads)
+    body = b'{"volume": NaN}'
+    with pytest.raises(orjson.JSONDecodeError):
+        orjson.loads(body)
+
+    result = client._decode_json(body)
+
+    assert result["volume"] != result["volume"]
+
+
+def test_decode_json_invalid() -> None:
+    """Input neither decoder accepts raises."""
+    client = EversoloApiClient("127.0.0.1", 0, None, json_loads=orjson.loads)
+
+    with pytest.raises(json.JSONDecodeError):
+        client._decode_json(b"{")
+
+
+def test_decode_json_empty_body() -> None:
+    """An empty body decodes to None."""
+    client = EversoloApiClient("127.0.0.1", 0, None)
+
+    assert client._decode_json(b" \n") is None
@@ -0,0 +1,213 @@
+"""Tests for the poll scheduling helpers."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.eversolo.const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_MAX,
+    BREAKER_RESET_MIN,
+    OFFLINE_BACKOFF_JITTER,
+    OFFLINE_BACKOFF_MAX,
+    OFFLINE_BACKOFF_MIN,
+    POLL_INTERVAL_IDLE,
+    POLL_INTERVAL_PAUSED,
+    POLL_INTERVAL_PLAYING,
+)
+from custom_components.eversolo.scheduler import (
+    AdaptivePollInterval,
+    CircuitBreaker,
+    EndpointScheduler,
+)
+
+PLAYING = 3
+PAUSED = 4
+IDLE = 0
+
+
+def test_all_endpoints_due_at_first(clock) -> None:
+    """Every endpoint is fetched in the first cycle."""
+    scheduler = EndpointScheduler({"fast": 1, "slow": 60}, clock)
+    assert scheduler.due() == ["fast", "slow"]
+
+
+def test_endpoints_due_per_tier(clock) -> None:
+    """Endpoints are due again once their own interval has passed."""
+    scheduler = EndpointScheduler({"fast": 1, "slow": 60}, clock)
+    scheduler.mark_fetched(["fast", "slow"])
+
+    clock.advance(1)
+    assert scheduler.due() == ["fast"]
+    scheduler.mark_fetched(["fast"])
+
+    clock.advance(59)
+    assert scheduler.due() == ["fast", "slow"]
+
+
+def test_due_tolerates_timer_drift(clock) -> None:
+    """An endpoint due just after the cycle starts is fetched in it."""
+    scheduler = EndpointScheduler({"fast": 1}, clock)
+    scheduler.mark_fetched(["fast"])
+
+    clock.advance(0.9)
+    assert scheduler.due() == ["fast"]
+
+
+def test_failed_endpoints_stay_due(clock) -> None:
+    """Only fetched endpoints are rescheduled."""
+    scheduler = EndpointScheduler({"fast": 1, "slow": 60}, clock)
+    scheduler.mark_fetched(["fast", "unknown"])
+
+    clock.advance(1)
+    assert scheduler.due() == ["fast", "slow"]
+
+
+def test_invalidate(clock) -> None:
+    """Invalidated endpoints are due immediately."""
+    scheduler = EndpointScheduler({"fast": 1, "slow": 60, "other": 60}, clock)
+    scheduler.mark_fetched(["fast", "slow", "other"])
+
+    scheduler.invalidate(["slow"])
+    assert scheduler.due() == ["slow"]
+
+    scheduler.invalidate()
+    assert scheduler.due() == ["fast", "slow", "other"]
+
+
+@pytest.mark.parametrize(
+    ("state", "interval"),
+    [
+        (PLAYING, POLL_INTERVAL_PLAYING),
+        (PAUSED, POLL_INTERVAL_PAUSED),
+        (IDLE, POLL_INTERVAL_IDLE),
+        (-1, POLL_INTERVAL_IDLE),
+    ],
+)
+def test_interval_by_playback_state(state: int, interval: float) -> None:
+    """The interval follows the playback state."""
+    assert AdaptivePollInterval().on_success(state) == interval
+
+
+def test_offline_backoff_without_jitter() -> None:
+    """The interval doubles per failure up to the maximum."""
+    engine = AdaptivePollInterval(rand=lambda: 0.5)
+
+    intervals = [engine.on_failure() for _ in range(8)]
+
+    assert intervals[:3] == [
+        OFFLINE_BACKOFF_MIN,
+        OFFLINE_BACKOFF_MIN * 2,
+        OFFLINE_BACKOFF_MIN * 4,
+    ]
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == OFFLINE_BACKOFF_MAX
+
+
+@pytest.mark.parametrize("rand", [0.0, 1.0])
+def test_offline_backoff_jitter(rand: float) -> None:
+    """Jitter spreads the interval by at most the jitter fraction."""
+    engine = AdaptivePollInterval(rand=lambda: rand)
+
+    interval = engine.on_failure()
+
+    sign = -1 if rand == 0.0 else 1
+    assert interval == pytest.approx(
+        OFFLINE_BACKOFF_MIN * (1 + sign * OFFLINE_BACKOFF_JITTER))
+
+
+def test_snap_back_after_success() -> None:
+    """The first success after failures polls fast, whatever the state."""
+    engine = AdaptivePollInterval(rand=lambda: 0.5)
+    engine.on_failure()
+    engine.on_failure()
+
+    assert engine.on_success(IDLE) == POLL_INTERVAL_PLAYING
+    assert engine.on_success(IDLE) == POLL_INTERVAL_IDLE
+
+    # The backoff starts over after the device came back
+    assert engine.on_failure() == OFFLINE_BACKOFF_MIN
+
+
+def test_snap_back_on_command() -> None:
+    """A user command polls fast and resets the backoff."""
+    engine = AdaptivePollInterval(rand=lambda: 0.5)
+    engine.on_success(IDLE)
+    engine.on_failure()
+    engine.on_failure()
+
+    assert engine.on_command() == POLL_INTERVAL_PLAYING
+    assert engine.on_failure() == OFFLINE_BACKOFF_MIN
+
+
+def test_set_intervals_keeps_schedule(clock) -> None:
+    """Replacing the endpoints keeps when the remaining ones are due."""
+    scheduler = EndpointScheduler({"fast": 1, "slow": 60, "gone": 60}, clock)
+    scheduler.mark_fetched(["fast", "slow", "gone"])
+
+    scheduler.set_intervals({"fast": 1, "slow": 60})
+    clock.advance(1)
+
+    assert scheduler.due() == ["fast"]
+    assert scheduler.intervals == {"fast": 1, "slow": 60}
+
+
+def _fail(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        breaker.record(breaker.allow(["slow"]), ())
+
+
+def test_breaker_opens_after_threshold(clock) -> None:
+    """An endpoint is skipped once it failed BREAKER_FAILURE_THRESHOLD times."""
+    breaker = CircuitBreaker(clock)
+
+    _fail(breaker, BREAKER_FAILURE_THRESHOLD - 1)
+    assert breaker.state("slow") == CircuitBreaker.CLOSED
+
+    _fail(breaker, 1)
+    assert breaker.state("slow") == CircuitBreaker.OPEN
+    assert breaker.allow(["fast", "slow"]) == ["fast"]
+    assert breaker.as_dict() == {"slow": CircuitBreaker.OPEN}
+
+
+def test_breaker_half_open_lets_one_fetch_through(clock) -> None:
+    """After the reset time a single fetch is let through."""
+    breaker = CircuitBreaker(clock)
+    _fail(breaker, BREAKER_FAILURE_THRESHOLD)
+
+    clock.advance(BREAKER_RESET_MIN)
+
+    assert breaker.allow(["slow"]) == ["slow"]
+    assert breaker.state("slow") == CircuitBreaker.HALF_OPEN
+    assert breaker.allow(["slow"]) == []
+
+
+def test_breaker_closes_on_success(clock) -> None:
+    """A successful retry closes the circuit."""
+    breaker = CircuitBreaker(clock)
+    _fail(breaker, BREAKER_FAILURE_THRESHOLD)
+    clock.advance(BREAKER_RESET_MIN)
+
+    breaker.record(breaker.allow(["slow"]), ["slow"])
+
+    assert breaker.state("slow") == CircuitBreaker.CLOSED
+    assert not breaker.as_dict()
+    _fail(breaker, BREAKER_FAILURE_THRESHOLD - 1)
+    assert breaker.state("slow") == CircuitBreaker.CLOSED
+
+
+def test_breaker_reset_doubles_up_to_max(clock) -> None:
+    """Every failed retry doubles the reset time, up to BREAKER_RESET_MAX."""
+    breaker = CircuitBreaker(clock)
+    _fail(breaker, BREAKER_FAILURE_THRESHOLD)
+    reset_after = BREAKER_RESET_MIN
+
+    for _ in range(10):
+        clock.advance(reset_after)
+        _fail(breaker, 1)
+        reset_after = min(reset_after * 2, BREAKER_RESET_MAX)
+        clock.advance(reset_after - 0.1)
+        assert breaker.allow(["slow"]) == []
+
+    clock.advance(0.1)
+    assert breaker.allow(["slow"]) == ["slow"]
+    assert reset_after == BREAKER_RESET_MAX